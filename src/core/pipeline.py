@@ -3,8 +3,9 @@ from typing import Optional
 from pydantic import BaseModel, Field
 
 from src.core.processor import OrderProcessor
-from src.data.items_service import ItemsService
-from src.data.supplier_service import SupplierService
+from src.data.extraction_cache_service import get_extraction_cache_service
+from src.data.items_service import get_items_service
+from src.data.supplier_service import get_supplier_service
 from src.export.new_items_generator import filter_new_items_from_order
 from src.extraction.local_detector import LocalSupplierDetector
 from src.extraction.vertex_client import detect_supplier
@@ -53,10 +54,11 @@ class ExtractionPipeline:
     """
 
     def __init__(self):
-        self.supplier_service = SupplierService()
-        self.items_service = ItemsService()
-        self.local_detector = LocalSupplierDetector()
-        self.processor = OrderProcessor()
+        # Process-wide services: one Firestore client and one supplier cache shared with Phase 1
+        self.supplier_service = get_supplier_service()
+        self.items_service = get_items_service()
+        self.local_detector = LocalSupplierDetector(self.supplier_service)
+        self.processor = OrderProcessor(extraction_cache=get_extraction_cache_service())
 
     def run_pipeline(
         self,
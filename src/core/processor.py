@@ -1,10 +1,24 @@
+import copy
+import functools
+import hashlib
+import json
 import os
-from collections import defaultdict
+import threading
+from collections import OrderedDict, defaultdict
 from typing import List, Optional, Tuple
 
 from src.core.exceptions import ExtractionError, ValidationError
+from src.data.extraction_cache_service import ExtractionCacheService
 from src.extraction import vertex_client
-from src.shared.constants import MAX_RETRIES, VALIDATION_TOLERANCE, VAT_RATE
+from src.extraction.prompts import get_invoice_extraction_prompt_parts
+from src.extraction.schemas import raw_response_schema
+from src.shared.constants import (
+    EXTRACTION_MODEL_TRIAL_1,
+    EXTRACTION_MODEL_TRIAL_2,
+    MAX_RETRIES,
+    VALIDATION_TOLERANCE,
+    VAT_RATE,
+)
 from src.shared.logger import get_logger
 from src.shared.models import ExtractedOrder, LineItem, MultiOrderResponse
 from src.shared.utils import get_mime_type
@@ -12,6 +26,64 @@ from src.shared.utils import get_mime_type
 # Configure logger
 logger = get_logger(__name__)
 
+# Max validated extraction results kept per process (oldest evicted first)
+EXTRACTION_CACHE_SIZE = 32
+
+# Bump when post-processing or validation changes what a cached extraction would contain
+EXTRACTION_CACHE_VERSION = 1
+
+# Warnings attached when the trial 1 result is returned in place of trial 2
+BOTH_ATTEMPTS_FAILED_WARNING = "Best-effort result: both extraction attempts failed validation."
+RETRY_FAILED_WARNING = "Best-effort result: the retry failed; returning the first attempt, which failed validation."
+
+# Cache key -> (orders, raw responses, metadata). Only results that passed validation without warnings are stored.
+_extraction_cache: OrderedDict[str, tuple[list[ExtractedOrder], dict, dict]] = OrderedDict()
+_extraction_cache_lock = threading.Lock()
+
+
+@functools.cache
+def _extraction_fingerprint() -> bytes:
+    """Digest of everything besides the inputs that shapes an extraction (prompts, schema, models)."""
+    h = hashlib.sha256(f"{EXTRACTION_CACHE_VERSION}|{EXTRACTION_MODEL_TRIAL_1}|{EXTRACTION_MODEL_TRIAL_2}".encode())
+    for trial in (1, 2):
+        h.update(get_invoice_extraction_prompt_parts(trial=trial)[0].encode())
+    h.update(json.dumps(raw_response_schema).encode())
+    return h.digest()
+
+
+def _extraction_cache_key(
+    file_path: str, mime_type: str, email_context: str | None, supplier_instructions: str | None
+) -> str | None:
+    """Content-addressed cache key for an extraction, or None if the file cannot be read."""
+    h = hashlib.sha256(_extraction_fingerprint())
+    try:
+        # Hashed in chunks, so the key never holds the whole invoice in memory
+        with open(file_path, "rb") as f:
+            h.update(hashlib.file_digest(f, "sha256").digest())
+    except OSError:
+        return None
+    h.update(json.dumps([mime_type, email_context or "", supplier_instructions or ""]).encode())
+    return h.hexdigest()
+
+
+def _get_cached_extraction(key: str) -> tuple[list[ExtractedOrder], dict, dict] | None:
+    with _extraction_cache_lock:
+        cached = _extraction_cache.get(key)
+        if cached is None:
+            return None
+        _extraction_cache.move_to_end(key)
+    # Callers mutate the orders (supplier fields, cost split), so hand out copies
+    return copy.deepcopy(cached)
+
+
+def _store_cached_extraction(key: str, result: tuple[list[ExtractedOrder], dict, dict]):
+    result = copy.deepcopy(result)
+    with _extraction_cache_lock:
+        _extraction_cache[key] = result
+        _extraction_cache.move_to_end(key)
+        while len(_extraction_cache) > EXTRACTION_CACHE_SIZE:
+            _extraction_cache.popitem(last=False)
+
 
 class OrderProcessor:
     """
@@ -22,6 +94,14 @@ class OrderProcessor:
     4. Managing retries if validation fails.
     """
 
+    def __init__(self, extraction_cache: ExtractionCacheService | None = None):
+        """
+        Args:
+            extraction_cache: Optional persistent cache shared across processes. Validated results are
+                always kept in a small per-process cache as well.
+        """
+        self.extraction_cache = extraction_cache
+
     def process_file(
         self,
         file_path: str,
@@ -40,11 +120,22 @@ class OrderProcessor:
             mime_type = get_mime_type(file_path)
             logger.info(f"Auto-detected MIME type: {mime_type}")
 
+        # Identical file + context already extracted and validated: skip the LLM
+        cache_key = _extraction_cache_key(file_path, mime_type, email_context, supplier_instructions)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            cached_orders, cached_raw_responses, cached_metadata = cached
+            logger.info(f"{trace_context}♻️ Reusing validated extraction for identical file (no LLM call).")
+            return cached_orders, 0.0, cached_raw_responses, cached_metadata
+
         attempt = 0
         final_orders = []
         total_cost = 0.0
         all_raw_responses = {}
         final_metadata = {}
+        validation_passed = False
+        # Trial 1 result kept after it failed validation: (orders, total diff, metadata, structural failure)
+        fallback_attempt = None
 
         while attempt <= MAX_RETRIES:
             trial_version = 1 if attempt == 0 else 2
@@ -71,19 +162,32 @@ class OrderProcessor:
                 if attempt < MAX_RETRIES:
                     attempt += 1
                     continue
-                return [], total_cost, all_raw_responses, {}
+                if not self._fallback_usable(fallback_attempt):
+                    return [], total_cost, all_raw_responses, {}
+                final_orders, final_metadata = self._use_fallback_attempt(
+                    fallback_attempt, RETRY_FAILED_WARNING, trace_context
+                )
+                break
 
             if not orders:
                 logger.info(f"{trace_context}No orders returned from extraction (attempt {attempt + 1}).")
                 if attempt < MAX_RETRIES:
                     attempt += 1
                     continue
-                return [], total_cost, all_raw_responses, final_metadata
+                if not self._fallback_usable(fallback_attempt):
+                    return [], total_cost, all_raw_responses, final_metadata
+                final_orders, final_metadata = self._use_fallback_attempt(
+                    fallback_attempt, RETRY_FAILED_WARNING, trace_context
+                )
+                break
 
             logger.info(f"✅ LLM returned {len(orders)} order(s). Applying post-processing (Trial {trial_version})...")
 
             validated_data = []
             critical_failure_found = False
+            # Failures other than the document total (swapped columns, quantity mismatch)
+            structural_failure_found = False
+            total_diff = 0.0
 
             for i, order in enumerate(orders):
                 # Step 2: Post-Processing logic
@@ -118,10 +222,12 @@ class OrderProcessor:
                         order.warnings.append(msg)
                         if trial_version == 1:
                             critical_failure_found = True
+                            structural_failure_found = True
                         break
 
                 # 3b. Total Amount Validation
                 is_valid_total, calc_total, diff_total = self._validate_totals(order, trial_version)
+                total_diff += diff_total
 
                 if not is_valid_total:
                     reason_msg = f" (Reason: {order.math_reasoning})" if order.math_reasoning else ""
@@ -147,6 +253,7 @@ class OrderProcessor:
                     order.warnings.append(msg)
                     if trial_version == 1:
                         critical_failure_found = True
+                        structural_failure_found = True
                 else:
                     logger.info(f"{trace_context}✅ Quantity validation passed. Diff: {diff_qty}")
 
@@ -157,11 +264,26 @@ class OrderProcessor:
                 logger.warning(
                     f"{trace_context}CRITICAL validation failed. Switching to trial 2 logic (next attempt: {attempt + 1})."
                 )
+                fallback_attempt = (validated_data, total_diff, metadata, structural_failure_found)
                 attempt += 1
                 continue
 
             # If we get here, either success or max retries reached
             final_orders = validated_data
+            # Trial 2 only warns on quantity problems; a warned result must not be replayed as clean
+            validation_passed = not critical_failure_found and not any(order.warnings for order in final_orders)
+
+            # Both trials failed: keep the earlier result if its only problem was a smaller total mismatch.
+            # Summed diffs are only comparable when both attempts split the document into the same orders.
+            if (
+                critical_failure_found
+                and self._fallback_usable(fallback_attempt)
+                and len(fallback_attempt[0]) == len(validated_data)
+                and fallback_attempt[1] < total_diff
+            ):
+                final_orders, final_metadata = self._use_fallback_attempt(
+                    fallback_attempt, BOTH_ATTEMPTS_FAILED_WARNING, trace_context
+                )
             logger.info(f"{trace_context}Extraction phase finished. Total orders: {len(final_orders)}")
             break
 
@@ -169,8 +291,46 @@ class OrderProcessor:
             for order in final_orders:
                 order.ai_metadata = final_metadata
 
+        if final_orders and validation_passed:
+            self._store_cached(cache_key, (final_orders, all_raw_responses, final_metadata))
+
         return final_orders, total_cost, all_raw_responses, final_metadata
 
+    @staticmethod
+    def _fallback_usable(fallback_attempt: tuple | None) -> bool:
+        """An earlier attempt may stand in for a failed retry only if its sole problem was the total."""
+        return fallback_attempt is not None and not fallback_attempt[3]
+
+    @staticmethod
+    def _use_fallback_attempt(
+        fallback_attempt: tuple, warning: str, trace_context: str = ""
+    ) -> tuple[list[ExtractedOrder], dict]:
+        """Returns the orders and metadata of an earlier attempt, flagged with a best-effort `warning`."""
+        orders, _, metadata, _ = fallback_attempt
+        logger.warning(f"{trace_context}Retry did not produce a better extraction. Returning the trial 1 result.")
+        for order in orders:
+            order.warnings.append(warning)
+        return orders, metadata
+
+    def _get_cached(self, key: str | None) -> tuple[list[ExtractedOrder], dict, dict] | None:
+        """Looks up a validated extraction in the process cache, then the persistent one."""
+        if key is None:
+            return None
+        cached = _get_cached_extraction(key)
+        if cached is None and self.extraction_cache is not None:
+            cached = self.extraction_cache.get(key)
+            if cached is not None:
+                _store_cached_extraction(key, cached)
+        return cached
+
+    def _store_cached(self, key: str | None, result: tuple[list[ExtractedOrder], dict, dict]):
+        # Warned results must go back to the model next time, in this process or any other
+        if key is None or any(order.warnings for order in result[0]):
+            return
+        _store_cached_extraction(key, result)
+        if self.extraction_cache is not None:
+            self.extraction_cache.put(key, *result)
+
     def _calculate_final_net_price(
         self,
         raw_unit_price: float,
@@ -234,40 +234,23 @@ def render_order_session() -> None:  # noqa: C901
     st.subheader(get_text("editor_title"))
 
     items_service = ItemsService()
-    display_data = []
+    line_items = data.get("line_items", [])
 
-    all_barcodes = [str(item.get("barcode", "")).strip() for item in data.get("line_items", []) if item.get("barcode")]
-    items_map: dict[str, str] = {}
+    all_barcodes = [str(item.get("barcode", "")).strip() for item in line_items if item.get("barcode")]
+    # barcode -> item dict; leading-zero mismatches are resolved by the service
+    items_map = items_service.get_items_by_barcodes(all_barcodes) if all_barcodes else {}
 
-    if all_barcodes:
-        db_items = items_service.get_items_batch(all_barcodes)
-        for db_item in db_items:
-            b = str(db_item.get("barcode"))
-            code = db_item.get("item_code")
-            if b and code:
-                items_map[b] = code
-
-    for item in data.get("line_items", []):
+    # Rows are tuples already in display column order (no per-row dicts or column reindex)
+    display_cols = ["item_code", "description", "quantity", "final_net_price"]
+    display_rows = []
+    for item in line_items:
         barcode = str(item.get("barcode", "")).strip() if item.get("barcode") else ""
-        item_code_val = barcode
-        if barcode in items_map:
-            item_code_val = items_map[barcode]
-        elif barcode.startswith("0") and barcode.lstrip("0") in items_map:
-            item_code_val = items_map[barcode.lstrip("0")]
-
-        display_data.append(
-            {
-                "item_code": item_code_val,
-                "description": item.get("description", ""),
-                "quantity": item.get("quantity", 0),
-                "final_net_price": item.get("final_net_price", 0),
-                "_barcode": barcode,
-            }
+        item_code_val = items_map.get(barcode, {}).get("item_code") or barcode
+        display_rows.append(
+            (item_code_val, item.get("description", ""), item.get("quantity", 0), item.get("final_net_price", 0))
         )
 
-    df = pd.DataFrame(display_data)
-    display_cols = ["item_code", "description", "quantity", "final_net_price"]
-    df_display = df[display_cols].copy() if not df.empty else pd.DataFrame(columns=display_cols)
+    df_display = pd.DataFrame(display_rows, columns=display_cols)
 
     # Rename columns to Hebrew for display
     df_display_heb = df_display.rename(
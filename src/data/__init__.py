@@ -2,7 +2,7 @@
 Data services for items and supplier management.
 """
 
-from .items_service import ItemsService
-from .supplier_service import UNKNOWN_SUPPLIER, SupplierService
+from .items_service import ItemsService, get_items_service
+from .supplier_service import UNKNOWN_SUPPLIER, SupplierService, get_supplier_service
 
-__all__ = ["ItemsService", "SupplierService", "UNKNOWN_SUPPLIER"]
+__all__ = ["ItemsService", "SupplierService", "UNKNOWN_SUPPLIER", "get_items_service", "get_supplier_service"]
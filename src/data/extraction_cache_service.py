@@ -0,0 +1,75 @@
+"""
+Persistent cache of validated invoice extractions.
+
+Lets a byte-identical file with the same context (duplicate emails, reprocessing) skip the LLM
+even when it lands on a different Cloud Function instance.
+"""
+
+import json
+
+from google.cloud import firestore
+
+from src.shared.config import settings
+from src.shared.logger import get_logger
+from src.shared.models import ExtractedOrder
+
+logger = get_logger(__name__)
+
+
+class ExtractionCacheService:
+    """Stores post-processed extraction results in Firestore, keyed by a content hash."""
+
+    def __init__(self, firestore_client: firestore.Client | None = None):
+        self._db = firestore_client or firestore.Client(project=settings.PROJECT_ID)
+        self._collection = self._db.collection(settings.FIRESTORE_EXTRACTION_CACHE_COLLECTION)
+
+    def get(self, key: str) -> tuple[list[ExtractedOrder], dict, dict] | None:
+        """
+        Returns (orders, raw_responses, metadata) for a cached extraction, or None on miss.
+        Read errors are logged and treated as a miss.
+        """
+        try:
+            doc = self._collection.document(key).get()
+            if not doc.exists:
+                return None
+            payload = json.loads((doc.to_dict() or {})["payload"])
+            orders = [ExtractedOrder.model_validate(order) for order in payload["orders"]]
+            # JSON object keys are strings; raw responses are keyed by trial number
+            raw_responses = {int(trial): raw for trial, raw in payload["raw_responses"].items()}
+            return orders, raw_responses, payload["metadata"]
+        except Exception as e:
+            logger.warning(f"Failed to read extraction cache entry {key}: {e}")
+            return None
+
+    def put(self, key: str, orders: list[ExtractedOrder], raw_responses: dict, metadata: dict):
+        """Stores a validated extraction. Write errors are logged and ignored."""
+        try:
+            # Serialized as one JSON string: raw responses have int keys and arbitrary nesting
+            payload = json.dumps(
+                {
+                    "orders": [order.model_dump(mode="json") for order in orders],
+                    "raw_responses": raw_responses,
+                    "metadata": metadata,
+                },
+                ensure_ascii=False,
+                default=str,
+            )
+            self._collection.document(key).set({"payload": payload, "created_at": firestore.SERVER_TIMESTAMP})
+        except Exception as e:
+            logger.warning(f"Failed to write extraction cache entry {key}: {e}")
+
+
+# Process-wide instance, created lazily by get_extraction_cache_service()
+_SINGLETON: ExtractionCacheService | None = None
+
+
+def get_extraction_cache_service() -> ExtractionCacheService:
+    """
+    Get the shared ExtractionCacheService instance, creating it on first call.
+
+    Avoids building a new Firestore client (channel and credential setup) for every pipeline.
+    """
+    global _SINGLETON
+    if _SINGLETON is None:
+        _SINGLETON = ExtractionCacheService()
+    return _SINGLETON
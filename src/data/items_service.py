@@ -4,6 +4,8 @@ Items Service for barcode lookup and new item detection.
 Uses Firestore as the backing store with in-memory caching for performance.
 """
 
+import time
+from collections.abc import Iterable
 from typing import List, Optional, Set
 
 from google.cloud import firestore
@@ -272,12 +274,11 @@ class ItemsService:
 
         results = []
 
-        refs = [self._collection.document(b) for b in list(lookup_ids)]
-        import time
+        # A single get_all (BatchGetDocuments RPC) for every id; missing docs come back with exists=False
+        refs = [self._collection.document(b) for b in lookup_ids]
 
         t_start = time.time()
         docs = self._db.get_all(refs)
-        logger.info(f"get_items_batch: Firestore get_all({len(refs)} refs) took {time.time() - t_start:.2f}s")
 
         for doc in docs:
             if doc.exists:
@@ -285,8 +286,33 @@ class ItemsService:
                 data["barcode"] = doc.id
                 results.append(data)
 
+        # get_all streams lazily, so time the fully consumed batch
+        logger.info(f"get_items_batch: Firestore get_all({len(refs)} refs) took {time.time() - t_start:.2f}s")
         return results
 
+    def get_items_by_barcodes(self, barcodes: Iterable[str]) -> dict[str, dict]:
+        """
+        Resolve barcodes to item dicts with a single batched lookup.
+
+        An exact barcode match wins; otherwise the stripped (no leading zeros) version is used.
+
+        Args:
+            barcodes: Barcodes to lookup
+
+        Returns:
+            Dict mapping each requested (stripped of whitespace) barcode to its item dict.
+            Barcodes not in the database are omitted.
+        """
+        requested = [str(b).strip() for b in barcodes if b]
+        found = {item["barcode"]: item for item in self.get_items_batch(requested)}
+
+        lookup = {}
+        for barcode in requested:
+            item = found.get(barcode) or found.get(barcode.lstrip("0"))
+            if item:
+                lookup[barcode] = item
+        return lookup
+
     def get_item(self, barcode: str) -> dict | None:
         """
         Get item details by barcode.
@@ -395,7 +421,8 @@ class ItemsService:
         if not query:
             return []
 
-        results = []
+        # Results keyed by barcode (document id), so duplicates collapse with a dict probe
+        results: dict[str, dict] = {}
 
         # 1. Try direct barcode lookup
         # Try exact match
@@ -403,7 +430,7 @@ class ItemsService:
         if doc.exists:
             data = doc.to_dict()
             data["barcode"] = doc.id
-            results.append(data)
+            results[doc.id] = data
 
         # 2. Try simple name search (requires client-side filtering or full text search engine)
         if not results:
@@ -419,13 +446,12 @@ class ItemsService:
             )
 
             for doc in name_query:
-                data = doc.to_dict()
-                data["barcode"] = doc.id
-                # Avoid duplicates
-                if not any(r["barcode"] == data["barcode"] for r in results):
-                    results.append(data)
+                if doc.id not in results:
+                    data = doc.to_dict()
+                    data["barcode"] = doc.id
+                    results[doc.id] = data
 
-        return results
+        return list(results.values())
 
     def get_random_items(self, limit: int = 2) -> list[dict]:
         """
@@ -445,3 +471,19 @@ class ItemsService:
             data["barcode"] = doc.id
             results.append(data)
         return results
+
+
+# Process-wide instance, created lazily by get_items_service()
+_SINGLETON: ItemsService | None = None
+
+
+def get_items_service() -> ItemsService:
+    """
+    Get the shared ItemsService instance, creating it on first call.
+
+    Avoids building a new Firestore client (channel and credential setup) for every order.
+    """
+    global _SINGLETON
+    if _SINGLETON is None:
+        _SINGLETON = ItemsService()
+    return _SINGLETON
@@ -11,11 +11,16 @@ Matching priority:
 7. Fallback - return "UNKNOWN"
 """
 
-import io
+import copy
+import functools
+import sys
+import threading
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 
 from google.cloud import firestore
+from google.cloud.firestore import SERVER_TIMESTAMP
 
 from src.shared.logger import get_logger
 
@@ -25,39 +30,92 @@ logger = get_logger(__name__)
 UNKNOWN_SUPPLIER = "UNKNOWN"
 
 # Excluded email domains - don't match suppliers by these domains
-EXCLUDED_EMAIL_DOMAINS = {
-    # Free email providers
-    "gmail.com",
-    "yahoo.com",
-    "hotmail.com",
-    "outlook.com",
-    "live.com",
-    "aol.com",
-    "icloud.com",
-    "mail.com",
-    "protonmail.com",
-    "zoho.com",
-    "yandex.com",
-    # Israeli ISP emails
-    "walla.co.il",
-    "walla.com",
-    "012.net.il",
-    "netvision.net.il",
-    "bezeqint.net",
-    "zahav.net.il",
-    "013.net",
-    "smile.net.il",
-    "013net.net",
-    "barak.net.il",
-    "internet-zahav.net",
-    "inter.net.il",
-    # Your company domains (don't match to self)
-    "superhome.co.il",
-}
+# Interned so lookups against (also interned) cached domains hit the identity fast-path
+EXCLUDED_EMAIL_DOMAINS = frozenset(
+    sys.intern(domain)
+    for domain in (
+        # Free email providers
+        "gmail.com",
+        "yahoo.com",
+        "hotmail.com",
+        "outlook.com",
+        "live.com",
+        "aol.com",
+        "icloud.com",
+        "mail.com",
+        "protonmail.com",
+        "zoho.com",
+        "yandex.com",
+        # Israeli ISP emails
+        "walla.co.il",
+        "walla.com",
+        "012.net.il",
+        "netvision.net.il",
+        "bezeqint.net",
+        "zahav.net.il",
+        "013.net",
+        "smile.net.il",
+        "013net.net",
+        "barak.net.il",
+        "internet-zahav.net",
+        "inter.net.il",
+        # Your company domains (don't match to self)
+        "superhome.co.il",
+    )
+)
 
 # CSV Cache TTL (Time-To-Live) - fallback when no _meta document exists
 CSV_CACHE_TTL = timedelta(hours=24)
 
+# How long get_supplier()/get_supplier_instructions() trust the in-memory cache. The cache is otherwise
+# only refreshed by the _meta check in get_suppliers_csv(), which locally detected orders never reach,
+# so dashboard edits made in another process are picked up by a document read once this expires.
+SUPPLIER_DOC_CACHE_TTL = timedelta(minutes=5)
+
+# Max distinct (global_id, phone, email, name) probes memoized by match_supplier
+MATCH_CACHE_SIZE = 4096
+
+# Translation table that deletes every ASCII non-digit (dashes, spaces, "+", parentheses...)
+_NON_DIGIT_TABLE = str.maketrans("", "", "".join(chr(c) for c in range(128) if not chr(c).isdigit()))
+
+
+def _clean_phone(phone) -> str:
+    """Reduce a phone number to its digits."""
+    clean_phone = str(phone).translate(_NON_DIGIT_TABLE)
+    if not clean_phone.isascii():
+        # Rare non-ASCII input: fall back to the full Unicode digit filter
+        clean_phone = "".join(filter(str.isdigit, clean_phone))
+    return clean_phone
+
+
+@dataclass(frozen=True, eq=False)
+class _SupplierSnapshot:
+    """
+    One generation of the in-memory supplier caches.
+
+    Columns hold one entry per supplier (row i of every column describes the same supplier) and the
+    lookup dicts map a normalized key -> row index. A snapshot is never modified once published:
+    invalidate_cache() drops it with a single attribute assignment, so a reader holding a reference
+    always sees columns and indexes from the same load.
+    """
+
+    codes: tuple[str, ...]
+    names: tuple[str, ...]
+    global_ids: tuple[str, ...]
+    emails: tuple[str, ...]
+    additional_emails: tuple[list[str], ...]
+    phones: tuple[str, ...]
+    special_instructions: tuple[str, ...]
+    # Raw Firestore documents, so get_supplier() returns the same shape with or without the cache
+    docs: tuple[dict, ...]
+    idx_by_code: dict[str, int]
+    global_id_cache: dict[str, int]
+    email_cache: dict[str, int]
+    phone_cache: dict[str, int]
+    domain_cache: dict[str, int]
+    name_cache: dict[str, int]
+    loaded_at: datetime
+
 
 class SupplierService:
     """Service for supplier matching and lookup."""
@@ -81,20 +139,10 @@ class SupplierService:
         self._collection = self._db.collection("suppliers")
         self._meta_doc = self._collection.document(self.META_DOC_ID)
 
-        # Cache for global_id -> supplier_code mapping
-        self._global_id_cache: dict[str, str] = {}
-        # Cache for email -> supplier_code mapping
-        self._email_cache: dict[str, str] = {}
-        # Cache for phone -> supplier_code mapping
-        self._phone_cache: dict[str, str] = {}
-        # Cache for domain -> supplier_code mapping
-        self._domain_cache: dict[str, str] = {}
-        # Cache for name -> supplier_code mapping
-        self._name_cache: dict[str, str] = {}
-        # All suppliers data for CSV generation and fuzzy matching
-        self._all_suppliers: list[dict] = []
-
-        self._cache_loaded = False
+        # Current cache generation, loaded on first use and replaced (never mutated) on invalidation
+        self._snapshot: _SupplierSnapshot | None = None
+        # Guards the one-time cache load against concurrent first requests
+        self._load_lock = threading.Lock()
 
         # CSV cache for LLM context
         self._csv_cache: str | None = None
@@ -102,34 +150,64 @@ class SupplierService:
         # Track the meta timestamp we cached against
         self._cached_meta_timestamp: datetime | None = None
 
-    def _ensure_cache_loaded(self):
-        """Load supplier lookups into memory cache."""
-        if self._cache_loaded:
-            return
-
+        # Memoized match_supplier results, kept per instance and cleared by invalidate_cache()
+        self._match_cached = functools.lru_cache(maxsize=MATCH_CACHE_SIZE)(self._match_supplier_uncached)
+        # Single-slot memo for fuzzy_match_name (the same unknown name is usually re-queried back to back).
+        # One (snapshot, query, result) tuple, replaced in a single assignment so readers never see a mixed pair.
+        self._last_fuzzy: tuple[_SupplierSnapshot, str, tuple[str, float] | None] | None = None
+
+    def _ensure_cache_loaded(self) -> _SupplierSnapshot:
+        """Return the supplier cache snapshot, loading it from Firestore on first use."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+
+        # Double-checked locking: concurrent first callers wait for a single collection stream
+        with self._load_lock:
+            if self._snapshot is None:
+                self._snapshot = self._load_cache()
+            return self._snapshot
+
+    def _load_cache(self) -> _SupplierSnapshot:
+        """Stream the suppliers collection and build a cache snapshot (caller holds _load_lock)."""
         logger.info("Loading suppliers cache from Firestore...")
         docs = self._collection.stream()
 
+        codes: list[str] = []
+        names: list[str] = []
+        global_ids: list[str] = []
+        emails: list[str] = []
+        additional_emails_col: list[list[str]] = []
+        phones: list[str] = []
+        special_instructions: list[str] = []
+        raw_docs: list[dict] = []
+        idx_by_code: dict[str, int] = {}
+        global_id_cache: dict[str, int] = {}
+        email_cache: dict[str, int] = {}
+        phone_cache: dict[str, int] = {}
+        domain_cache: dict[str, int] = {}
+        name_cache: dict[str, int] = {}
+
         for doc in docs:
             supplier_code = doc.id
             data = doc.to_dict()
 
             # Store full supplier data for CSV generation and fuzzy matching
-            supplier_record = {
-                "code": supplier_code,
-                "name": data.get("name", ""),
-                "global_id": data.get("global_id", ""),
-                "email": data.get("email", ""),
-                "additional_emails": data.get("additional_emails", []),
-                "phone": data.get("phone", ""),
-                "special_instructions": data.get("special_instructions", ""),
-            }
-            self._all_suppliers.append(supplier_record)
+            idx = len(codes)
+            codes.append(supplier_code)
+            names.append(data.get("name", ""))
+            global_ids.append(data.get("global_id", ""))
+            emails.append(data.get("email", ""))
+            additional_emails_col.append(data.get("additional_emails", []))
+            phones.append(data.get("phone", ""))
+            special_instructions.append(data.get("special_instructions", ""))
+            raw_docs.append(data)
+            idx_by_code[supplier_code] = idx
 
             # Index by global_id
             global_id = data.get("global_id")
             if global_id:
-                self._global_id_cache[str(global_id).strip()] = supplier_code
+                global_id_cache[str(global_id).strip()] = idx
 
             # Index by email (lowercase)
             email = data.get("email")
@@ -146,35 +224,52 @@ class SupplierService:
                         all_emails.append(str(ae).strip().lower())
 
             for e in all_emails:
-                self._email_cache[e] = supplier_code
+                email_cache[e] = idx
 
                 # Index by domain (but exclude common domains)
-                if "@" in e:
-                    domain = e.split("@")[-1]
+                _, at, domain = e.rpartition("@")
+                if at:
+                    domain = sys.intern(domain)
                     if domain not in EXCLUDED_EMAIL_DOMAINS:
-                        self._domain_cache[domain] = supplier_code
+                        domain_cache[domain] = idx
 
             # Index by phone
             phone = data.get("phone")
             if phone:
                 # Basic cleaning: remove dashes, spaces
-                clean_phone = "".join(filter(str.isdigit, str(phone)))
+                clean_phone = _clean_phone(phone)
                 if clean_phone:
-                    self._phone_cache[clean_phone] = supplier_code
+                    phone_cache[clean_phone] = idx
 
             # Index by name
             name = data.get("name")
             if name:
                 clean_name = str(name).strip().lower()
-                self._name_cache[clean_name] = supplier_code
+                name_cache[clean_name] = idx
 
         logger.info(
-            f"Suppliers cache loaded: {len(self._all_suppliers)} suppliers, "
-            f"{len(self._global_id_cache)} global_ids, {len(self._phone_cache)} phones, "
-            f"{len(self._email_cache)} emails, {len(self._domain_cache)} domains, "
-            f"{len(self._name_cache)} names"
+            f"Suppliers cache loaded: {len(codes)} suppliers, "
+            f"{len(global_id_cache)} global_ids, {len(phone_cache)} phones, "
+            f"{len(email_cache)} emails, {len(domain_cache)} domains, "
+            f"{len(name_cache)} names"
+        )
+        return _SupplierSnapshot(
+            codes=tuple(codes),
+            names=tuple(names),
+            global_ids=tuple(global_ids),
+            emails=tuple(emails),
+            additional_emails=tuple(additional_emails_col),
+            phones=tuple(phones),
+            special_instructions=tuple(special_instructions),
+            docs=tuple(raw_docs),
+            idx_by_code=idx_by_code,
+            global_id_cache=global_id_cache,
+            email_cache=email_cache,
+            phone_cache=phone_cache,
+            domain_cache=domain_cache,
+            name_cache=name_cache,
+            loaded_at=datetime.now(),
         )
-        self._cache_loaded = True
 
     def match_supplier(self, global_id: str = None, email: str = None, phone: str = None, name: str = None) -> str:
         """
@@ -185,6 +280,8 @@ class SupplierService:
         2. Email address
         3. Returns "UNKNOWN" if no match
 
+        Results are memoized per instance on the normalized inputs until invalidate_cache().
+
         Args:
             global_id: The supplier's global ID (עוסק/ח"פ)
             email: The supplier's email address
@@ -193,49 +290,58 @@ class SupplierService:
         Returns:
             Internal supplier code or "UNKNOWN"
         """
-        self._ensure_cache_loaded()
+        snapshot = self._ensure_cache_loaded()
+
+        # Normalize inputs so equivalent probes share one memoized result
+        clean_global_id = str(global_id).strip() if global_id else None
+        clean_phone = _clean_phone(phone) if phone else None
+        clean_email = str(email).strip().lower() if email else None
+        clean_name = str(name).strip().lower() if name else None
 
+        # Keyed by snapshot too, so a result computed against a dropped generation is never reused
+        return self._match_cached(snapshot, clean_global_id, clean_phone, clean_email, clean_name)
+
+    def _match_supplier_uncached(
+        self,
+        snapshot: _SupplierSnapshot,
+        global_id: str | None,
+        phone: str | None,
+        email: str | None,
+        name: str | None,
+    ) -> str:
+        """Resolve already-normalized identifiers against the lookup caches (memoized per instance)."""
         # Try global_id first
-        if global_id:
-            global_id = str(global_id).strip()
-            if global_id in self._global_id_cache:
-                code = self._global_id_cache[global_id]
-                logger.info(f"Matched supplier by global_id {global_id} -> {code}")
-                return code
+        if global_id and global_id in snapshot.global_id_cache:
+            code = snapshot.codes[snapshot.global_id_cache[global_id]]
+            logger.info(f"Matched supplier by global_id {global_id} -> {code}")
+            return code
 
         # Try phone
-        if phone:
-            clean_phone = "".join(filter(str.isdigit, str(phone)))
-            if clean_phone and clean_phone in self._phone_cache:
-                code = self._phone_cache[clean_phone]
-                logger.info(f"Matched supplier by phone {phone} -> {code}")
-                return code
+        if phone and phone in snapshot.phone_cache:
+            code = snapshot.codes[snapshot.phone_cache[phone]]
+            logger.info(f"Matched supplier by phone {phone} -> {code}")
+            return code
 
         # Try email domain matching (Priority over exact email for this request)
         if email:
-            email = str(email).strip().lower()
-
             # 1. Try exact email match (legacy/fast)
-            if email in self._email_cache:
-                code = self._email_cache[email]
+            if email in snapshot.email_cache:
+                code = snapshot.codes[snapshot.email_cache[email]]
                 logger.info(f"Matched supplier by exact email {email} -> {code}")
                 return code
 
             # 2. Try domain match
-            if "@" in email:
-                domain = email.split("@")[-1]
-                if domain in self._domain_cache:
-                    code = self._domain_cache[domain]
-                    logger.info(f"Matched supplier by email domain {domain} -> {code}")
-                    return code
+            _, at, domain = email.rpartition("@")
+            if at and domain in snapshot.domain_cache:
+                code = snapshot.codes[snapshot.domain_cache[domain]]
+                logger.info(f"Matched supplier by email domain {domain} -> {code}")
+                return code
 
         # Try name (Exact match, normalized)
-        if name:
-            clean_name = str(name).strip().lower()
-            if clean_name in self._name_cache:
-                code = self._name_cache[clean_name]
-                logger.info(f"Matched supplier by name '{name}' -> {code}")
-                return code
+        if name and name in snapshot.name_cache:
+            code = snapshot.codes[snapshot.name_cache[name]]
+            logger.info(f"Matched supplier by name '{name}' -> {code}")
+            return code
 
         # No match found
         # Intermediate probe misses are common during multi-step detection flows.
@@ -253,6 +359,11 @@ class SupplierService:
         Returns:
             Supplier data dict or None if not found
         """
+        cached = self._cached_doc(supplier_code)
+        if cached is not None:
+            # Deep copy: callers may modify the dict (or its email list) without touching the cache
+            return copy.deepcopy(cached)
+
         doc = self._collection.document(str(supplier_code)).get()
 
         if doc.exists:
@@ -276,6 +387,10 @@ class SupplierService:
         if supplier_code == UNKNOWN_SUPPLIER:
             return None
 
+        cached = self._cached_doc(supplier_code)
+        if cached is not None:
+            return cached.get("special_instructions")
+
         doc = self._collection.document(str(supplier_code)).get()
 
         if doc.exists:
@@ -364,7 +479,7 @@ class SupplierService:
                 "email": email or "",
                 "phone": phone or "",
                 "special_instructions": special_instructions or "",
-                "created_at": datetime.now(),
+                "created_at": SERVER_TIMESTAMP,
             }
 
             doc_ref.set(supplier_data)
@@ -431,7 +546,7 @@ class SupplierService:
                 logger.warning("No fields to update")
                 return False
 
-            update_data["updated_at"] = datetime.now()
+            update_data["updated_at"] = SERVER_TIMESTAMP
 
             doc_ref.update(update_data)
             logger.info(f"Updated supplier: {supplier_code}")
@@ -464,10 +579,10 @@ class SupplierService:
         new_email = email.strip().lower()
 
         # 1. Global Conflict Check
-        self._ensure_cache_loaded()
+        snapshot = self._ensure_cache_loaded()
 
-        if new_email in self._email_cache:
-            existing_code = self._email_cache[new_email]
+        if new_email in snapshot.email_cache:
+            existing_code = snapshot.codes[snapshot.email_cache[new_email]]
             if existing_code != supplier_code:
                 logger.warning(
                     f"⚠️ Email {new_email} already assigned to DIFFERENT supplier {existing_code}. Cannot add to {supplier_code}."
@@ -499,12 +614,12 @@ class SupplierService:
 
             # Set as primary if empty
             if not primary_email:
-                doc_ref.update({"email": new_email, "updated_at": datetime.now()})
+                doc_ref.update({"email": new_email, "updated_at": SERVER_TIMESTAMP})
                 logger.info(f"Set primary email {new_email} to supplier {supplier_code}")
             else:
                 # Add to additional and update
                 current_emails.append(new_email)
-                doc_ref.update({"additional_emails": current_emails, "updated_at": datetime.now()})
+                doc_ref.update({"additional_emails": current_emails, "updated_at": SERVER_TIMESTAMP})
                 logger.info(f"Added additional email {new_email} to supplier {supplier_code}")
 
             # Invalidate cache
@@ -537,9 +652,9 @@ class SupplierService:
             return False, False
 
         # 1. Global Conflict Check
-        self._ensure_cache_loaded()
-        if cleaned_id in self._global_id_cache:
-            existing_code = self._global_id_cache[cleaned_id]
+        snapshot = self._ensure_cache_loaded()
+        if cleaned_id in snapshot.global_id_cache:
+            existing_code = snapshot.codes[snapshot.global_id_cache[cleaned_id]]
             if existing_code != supplier_code:
                 logger.warning(
                     f"⚠️ ID {cleaned_id} already assigned to DIFFERENT supplier {existing_code}. Cannot assign to {supplier_code}."
@@ -569,7 +684,7 @@ class SupplierService:
                 return True, False  # Already has an ID, consider it a success but not newly added
 
             # Update
-            doc_ref.update({"global_id": cleaned_id, "updated_at": datetime.now()})
+            doc_ref.update({"global_id": cleaned_id, "updated_at": SERVER_TIMESTAMP})
             logger.info(f"🎉 Auto-Learned: Added Global ID {cleaned_id} to supplier {supplier_code}")
 
             # Invalidate cache
@@ -588,8 +703,34 @@ class SupplierService:
         Returns:
             List of supplier dicts with code and details
         """
-        self._ensure_cache_loaded()
-        return self._all_suppliers.copy()
+        snapshot = self._ensure_cache_loaded()
+        return [self._supplier_record(snapshot, i) for i in range(len(snapshot.codes))]
+
+    def _cached_doc(self, supplier_code: str) -> dict | None:
+        """
+        Cached Firestore document of `supplier_code` from the warm cache, or None.
+
+        Never triggers a full load: a cold instance is cheaper served by a single document read,
+        and so is a cache older than SUPPLIER_DOC_CACHE_TTL (which may miss edits from other processes).
+        """
+        snapshot = self._snapshot
+        if snapshot is None or datetime.now() - snapshot.loaded_at >= SUPPLIER_DOC_CACHE_TTL:
+            return None
+        idx = snapshot.idx_by_code.get(str(supplier_code))
+        return None if idx is None else snapshot.docs[idx]
+
+    @staticmethod
+    def _supplier_record(snapshot: _SupplierSnapshot, idx: int) -> dict:
+        """Assemble the cached columns at row `idx` into a supplier dict."""
+        return {
+            "code": snapshot.codes[idx],
+            "name": snapshot.names[idx],
+            "global_id": snapshot.global_ids[idx],
+            "email": snapshot.emails[idx],
+            "additional_emails": list(snapshot.additional_emails[idx]),
+            "phone": snapshot.phones[idx],
+            "special_instructions": snapshot.special_instructions[idx],
+        }
 
     def _get_meta_timestamp(self) -> datetime | None:
         """Get the last_modified timestamp from the metadata document."""
@@ -609,7 +750,7 @@ class SupplierService:
     def _update_meta_timestamp(self):
         """Update the last_modified timestamp in the metadata document."""
         try:
-            self._meta_doc.set({"last_modified": datetime.now(), "updated_by": "supplier_service"}, merge=True)
+            self._meta_doc.set({"last_modified": SERVER_TIMESTAMP, "updated_by": "supplier_service"}, merge=True)
             logger.info("Updated suppliers metadata timestamp")
         except Exception as e:
             logger.error(f"Failed to update meta timestamp: {e}")
@@ -643,43 +784,36 @@ class SupplierService:
 
         # Regenerate from Firestore
         logger.info("Regenerating suppliers CSV from Firestore...")
-        self._ensure_cache_loaded()
-
-        # Build CSV
-        output = io.StringIO()
-        output.write("קוד,שם,עוסק_מורשה,טלפון,אימייל\n")
-
-        for supplier in self._all_suppliers:
-            code = supplier.get("code", "")
-            name = supplier.get("name", "")
-            global_id = supplier.get("global_id", "")
-            phone = supplier.get("phone", "")
-            email = supplier.get("email", "")
-
-            # Escape commas in fields
-            name = name.replace(",", " ")
-
-            output.write(f"{code},{name},{global_id},{phone},{email}\n")
-
-        self._csv_cache = output.getvalue()
+        if self._csv_cache:
+            # A stale CSV means the lookup data it was built from is stale too
+            self.invalidate_cache()
+        snapshot = self._ensure_cache_loaded()
+
+        # Build CSV (commas inside names are replaced so they don't break the columns)
+        header = "קוד,שם,עוסק_מורשה,טלפון,אימייל"
+        rows = [
+            f"{code},{name.replace(',', ' ')},{global_id},{phone},{email}"
+            for code, name, global_id, phone, email in zip(
+                snapshot.codes, snapshot.names, snapshot.global_ids, snapshot.phones, snapshot.emails, strict=True
+            )
+        ]
+
+        self._csv_cache = "\n".join([header, *rows]) + "\n"
         self._csv_cache_timestamp = datetime.now()
         self._cached_meta_timestamp = meta_timestamp or datetime.now()
 
-        logger.info(f"Generated suppliers CSV with {len(self._all_suppliers)} entries")
+        logger.info(f"Generated suppliers CSV with {len(snapshot.codes)} entries")
         return self._csv_cache
 
     def invalidate_cache(self):
         """Force cache invalidation. Call when suppliers are modified externally."""
-        self._cache_loaded = False
-        self._all_suppliers = []
-        self._global_id_cache = {}
-        self._email_cache = {}
-        self._phone_cache = {}
-        self._domain_cache = {}
-        self._name_cache = {}
-        self._csv_cache = None
-        self._csv_cache_timestamp = None
-        self._cached_meta_timestamp = None
+        with self._load_lock:
+            self._snapshot = None
+            self._csv_cache = None
+            self._csv_cache_timestamp = None
+            self._cached_meta_timestamp = None
+            self._match_cached.cache_clear()
+            self._last_fuzzy = None
         logger.info("Supplier cache invalidated")
 
     def fuzzy_match_name(self, query: str) -> tuple[str, float] | None:
@@ -699,7 +833,11 @@ class SupplierService:
         if not query:
             return None
 
-        self._ensure_cache_loaded()
+        # Immediate repeats (retry/validation flows) skip the scan entirely
+        snapshot = self._ensure_cache_loaded()
+        last_fuzzy = self._last_fuzzy
+        if last_fuzzy is not None and last_fuzzy[0] is snapshot and last_fuzzy[1] == query:
+            return last_fuzzy[2]
 
         # Try to import rapidfuzz, return None if not available
         try:
@@ -714,24 +852,44 @@ class SupplierService:
         SIMILARITY_THRESHOLD = 85  # High threshold to reduce false positives
         matches = []
 
-        for supplier in self._all_suppliers:
-            name = supplier.get("name", "")
+        for i, name in enumerate(snapshot.names):
             if not name:
                 continue
 
             name_normalized = name.strip().lower()
-            score = fuzz.ratio(query_normalized, name_normalized)
+            # score_cutoff lets rapidfuzz bail out early on names that cannot reach the threshold
+            score = fuzz.ratio(query_normalized, name_normalized, score_cutoff=SIMILARITY_THRESHOLD)
 
             if score >= SIMILARITY_THRESHOLD:
-                matches.append((supplier["code"], score, name))
+                matches.append((snapshot.codes[i], score, name))
 
         # Only return if exactly ONE strong match (no ambiguity)
+        result = None
         if len(matches) == 1:
             code, score, matched_name = matches[0]
             logger.info(f"Fuzzy matched '{query}' -> '{matched_name}' (code: {code}, score: {score})")
-            return (code, score / 100.0)  # Return as 0-1 scale
+            result = (code, score / 100.0)  # Return as 0-1 scale
         elif len(matches) > 1:
             logger.warning(f"Fuzzy match ambiguous for '{query}': {len(matches)} candidates found")
-            return None
 
-        return None
+        self._last_fuzzy = (snapshot, query, result)
+        return result
+
+
+# Process-wide instance, created lazily by get_supplier_service()
+_SINGLETON: SupplierService | None = None
+
+
+def get_supplier_service() -> SupplierService:
+    """
+    Get the shared SupplierService instance, creating it on first call.
+
+    Reusing one instance keeps the Firestore client (and its gRPC channel) and the
+    in-memory lookup caches alive across orders. Cache invalidation is process-local:
+    other processes only see supplier edits through the `_meta` timestamp check
+    performed by get_suppliers_csv().
+    """
+    global _SINGLETON
+    if _SINGLETON is None:
+        _SINGLETON = SupplierService()
+    return _SINGLETON
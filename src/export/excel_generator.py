@@ -1,29 +1,31 @@
-import os
-import sys
 from typing import List
 
-import pandas as pd
-
-# Add project root to path for imports
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
-
-from src.data.items_service import ItemsService
+from src.data.items_service import get_items_service
+from src.export.xlsx_writer import write_xlsx
 from src.shared.logger import get_logger
 from src.shared.models import ExtractedOrder, LineItem
 
 logger = get_logger(__name__)
 
+# Item Code, Quantity, Net Price
+EXCEL_HEADERS = ("קוד פריט", "כמות", "מחיר נטו")
+
 
 def _clean_str(val) -> str:
     """Helper to remove .0 from float-like strings and return empty string if None"""
     if val is None:
         return ""
+    # Numbers never need the string-casing checks below
+    if isinstance(val, int):
+        return str(val)
+    if isinstance(val, float):
+        if val != val:  # NaN
+            return ""
+        return str(int(val)) if val.is_integer() else str(val)
     s = str(val).strip()
-    if s.lower() == "nan" or s == "None" or not s:
+    if not s or s == "None" or (len(s) == 3 and s.lower() == "nan"):
         return ""
-    if s.endswith(".0"):
-        return s[:-2]
-    return s
+    return s.removesuffix(".0")
 
 
 def generate_excel_from_order(order: ExtractedOrder, output_path: str):
@@ -33,55 +35,32 @@ def generate_excel_from_order(order: ExtractedOrder, output_path: str):
     (Item Code, Quantity, Net Price)
     """
 
-    items_service = ItemsService()
-
-    # Transform data to list of dicts
-    data = []
-
-    # We might want to optimize this with a batch get if possible, but loop is fine for typical order sizes
-    # Collect all barcodes
-    barcodes = [str(item.barcode).strip() for item in order.line_items if item.barcode]
+    # Normalize each line's barcode once; reused for both the bulk lookup and the rows below
+    line_barcodes = [str(item.barcode).strip() if item.barcode else "" for item in order.line_items]
+    barcodes = [barcode for barcode in line_barcodes if barcode]
 
-    # Bulk lookup for item codes
-    # Returns list of dicts: [{'barcode': '...', 'item_code': '...', ...}, ...]
+    # Single batched lookup: barcode -> item dict (leading-zero mismatches resolved by the service)
+    # (orders with no barcodes never touch the items service)
     item_lookup = {}
     if barcodes:
         try:
-            db_items = items_service.get_items_batch(barcodes)
-            for db_item in db_items:
-                # Map barcode to item_code (if present, else fallback to barcode)
-                b_code = str(db_item.get("barcode"))
-                i_code = db_item.get("item_code")
-                if i_code:
-                    item_lookup[b_code] = i_code
+            item_lookup = get_items_service().get_items_by_barcodes(barcodes)
         except Exception as e:
             logger.warning(f"Failed to batch lookup items: {e}")
 
-    for item in order.line_items:
-        barcode = str(item.barcode).strip() if item.barcode else ""
-        # Default to barcode, override if found in lookup
-        item_code_val = item_lookup.get(barcode, barcode)
-
-        row = {"קוד פריט": _clean_str(item_code_val), "כמות": item.quantity, "מחיר נטו": item.final_net_price}
-        data.append(row)
-
-    df = pd.DataFrame(data)
-
-    # Ensure correct column order
-    cols_order = ["קוד פריט", "כמות", "מחיר נטו"]
-
-    # Handle case where no items extracted but we still want headers
-    if df.empty:
-        df = pd.DataFrame(columns=cols_order)
-    else:
-        # Ensure 'קוד פריט' exists even if data was empty loop
-        if "קוד פריט" not in df.columns:
-            df["קוד פריט"] = None
-        df = df[cols_order]
-
-    # Save to Excel
+    # Build the item-code column in one pass (default to barcode, override if found in lookup),
+    # then zip it with the quantity and price columns into rows
+    raw_codes = [item_lookup.get(barcode, {}).get("item_code") or barcode for barcode in line_barcodes]
+    rows = zip(
+        map(_clean_str, raw_codes),
+        [item.quantity for item in order.line_items],
+        [item.final_net_price for item in order.line_items],
+        strict=True,
+    )
+
+    # Save to Excel (headers are written even when no items were extracted)
     try:
-        df.to_excel(output_path, index=False)
+        write_xlsx(output_path, EXCEL_HEADERS, rows)
         if isinstance(output_path, str):
             logger.info(f"Excel file successfully generated at: {output_path}")
         else:
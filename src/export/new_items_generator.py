@@ -13,21 +13,17 @@ Output columns:
 - מספר ספק: Supplier code
 """
 
-import os
-import sys
 from typing import List
 
-import pandas as pd
-
-# Add project root to path for imports
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
-
+from src.export.xlsx_writer import write_xlsx
 from src.shared.logger import get_logger
 from src.shared.models import ExtractedOrder, LineItem
 from src.shared.product_pricing import calculate_sell_price, remove_vat
 
 logger = get_logger(__name__)
 
+NEW_ITEMS_HEADERS = ("ברקוד", "שם פריט", "ברקוד 2", "מכירה", "עלות נטו", "מספר ספק")
+
 
 def generate_new_items_excel(line_items: list[LineItem], supplier_code: str, output_path: str) -> str:
     """
@@ -42,44 +38,28 @@ def generate_new_items_excel(line_items: list[LineItem], supplier_code: str, out
         Path to the generated Excel file
     """
 
-    # Build data rows (deduplicated by barcode)
-    data = []
-    seen_barcodes = set()
-
+    # Deduplicate by barcode, keeping the first occurrence (dicts preserve insertion order)
+    unique_items: dict[str, LineItem] = {}
     for item in line_items:
-        barcode = str(item.barcode) if item.barcode else ""
-
-        # Skip if we've already seen this barcode
-        if barcode in seen_barcodes:
-            continue
-        seen_barcodes.add(barcode)
-
-        # Calculate sell price using the .90 rounding logic
-        sell_price = calculate_sell_price(item.final_net_price) if item.final_net_price else 0
-
-        row = {
-            "ברקוד": barcode,
-            "שם פריט": item.description,
-            "ברקוד 2": barcode,  # Copy of primary barcode
-            "מכירה": sell_price,
-            "עלות נטו": item.final_net_price,
-            "מספר ספק": supplier_code,
-        }
-        data.append(row)
-
-    df = pd.DataFrame(data)
-
-    # Ensure correct column order
-    cols_order = ["ברקוד", "שם פריט", "ברקוד 2", "מכירה", "עלות נטו", "מספר ספק"]
-
-    if df.empty:
-        df = pd.DataFrame(columns=cols_order)
-    else:
-        df = df[cols_order]
+        unique_items.setdefault(str(item.barcode) if item.barcode else "", item)
+
+    rows = [
+        # Secondary barcode column is a copy of the primary barcode.
+        # Sell price uses the .90 rounding logic.
+        (
+            barcode,
+            item.description,
+            barcode,
+            calculate_sell_price(item.final_net_price) if item.final_net_price else 0,
+            item.final_net_price,
+            supplier_code,
+        )
+        for barcode, item in unique_items.items()
+    ]
 
     # Save to Excel
-    df.to_excel(output_path, index=False)
-    logger.info(f"New items Excel generated: {output_path} ({len(data)} unique items)")
+    write_xlsx(output_path, NEW_ITEMS_HEADERS, rows)
+    logger.info(f"New items Excel generated: {output_path} ({len(rows)} unique items)")
 
     return output_path
 
@@ -95,12 +75,7 @@ def filter_new_items_from_order(order: ExtractedOrder, new_barcodes: list[str])
     Returns:
         List of LineItem objects for new items only
     """
-    new_barcode_set = set(str(b).strip() for b in new_barcodes)
-
-    new_items = []
-    for item in order.line_items:
-        barcode = str(item.barcode).strip() if item.barcode else ""
-        if barcode and barcode in new_barcode_set:
-            new_items.append(item)
+    # Empty barcodes are never "new", so a whitespace-only item barcode can't match
+    new_barcode_set = frozenset(filter(None, (b.strip() for b in map(str, new_barcodes))))
 
-    return new_items
+    return [item for item in order.line_items if item.barcode and str(item.barcode).strip() in new_barcode_set]
@@ -0,0 +1,30 @@
+"""
+Minimal streaming XLSX writer shared by the export generators.
+
+Uses openpyxl's write-only mode: rows are serialized as they are appended instead of
+building a styled cell grid (as pandas' DataFrame.to_excel does).
+"""
+
+from collections.abc import Iterable, Sequence
+from typing import IO
+
+from openpyxl import Workbook
+
+SHEET_NAME = "Sheet1"  # Matches the sheet name pandas used to produce
+
+
+def write_xlsx(output_path: str | IO[bytes], headers: Sequence[str], rows: Iterable[Sequence]) -> None:
+    """
+    Write a single-sheet workbook with a header row followed by `rows`.
+
+    Args:
+        output_path: File path or binary file-like object
+        headers: Column headers (first row)
+        rows: Row value tuples in header order; None becomes an empty cell
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(SHEET_NAME)
+    ws.append(list(headers))
+    for row in rows:
+        ws.append(row)
+    wb.save(output_path)
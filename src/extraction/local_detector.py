@@ -1,8 +1,9 @@
 import os
 import re
+from itertools import islice
 from typing import Dict, List, Optional, Set, Tuple
 
-import pandas as pd
+from openpyxl import load_workbook
 from pypdf import PdfReader
 
 from src.data.supplier_service import SupplierService
@@ -11,13 +12,16 @@ from src.shared.logger import get_logger
 
 logger = get_logger(__name__)
 
-# --- Regex Patterns ---
+# --- Regex Patterns (compiled once at import) ---
 # 9-digit Israeli Business ID (Osek Murshe / H.P.)
 # Matches 9 consecutive digits. Must NOT be preceded or followed by a digit.
-REGEX_ISRAELI_ID = r"(?<!\d)(\d{9})(?!\d)"
+REGEX_ISRAELI_ID = re.compile(r"(?<!\d)(\d{9})(?!\d)")
 
 # Email Addresses
-REGEX_EMAIL = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
+REGEX_EMAIL = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+
+# Spreadsheets: only the first rows are scanned (header/supplier info lives there)
+EXCEL_SCAN_ROWS = 20
 
 
 class LocalSupplierDetector:
@@ -26,13 +30,17 @@ class LocalSupplierDetector:
     Bypasses Vertex AI if a strong match is found.
     """
 
-    def __init__(self):
-        self.supplier_service = SupplierService()
+    def __init__(self, supplier_service: SupplierService | None = None):
+        # Callers that already hold a SupplierService pass it in so its lookup cache is loaded once
+        self.supplier_service = supplier_service or SupplierService()
         self.supplier_service._ensure_cache_loaded()
 
         # Load Blacklists from Config
         self.blacklist_ids = settings.blacklist_ids
         self.blacklist_emails = settings.blacklist_emails
+        # Split once into exact addresses and "@domain" wildcards (stored without the "@")
+        self._blacklist_exact = {e for e in self.blacklist_emails if not e.startswith("@")}
+        self._blacklist_domains = {e[1:] for e in self.blacklist_emails if e.startswith("@")}
 
         logger.info(
             f"LocalDetector initialized. Blacklist: {len(self.blacklist_ids)} IDs, {len(self.blacklist_emails)} Emails."
@@ -112,7 +120,7 @@ class LocalSupplierDetector:
 
         # 1. Sender Email Match
         # Extract email from "Name <email@domain.com>" format if needed
-        email_match = re.search(REGEX_EMAIL, sender)
+        email_match = REGEX_EMAIL.search(sender)
         if email_match:
             email = email_match.group(0).lower()
             found_ids.append(email)
@@ -143,7 +151,7 @@ class LocalSupplierDetector:
 
         # Check IDs first (Strongest)
         # Using strict regex from prototype
-        for match in re.finditer(REGEX_ISRAELI_ID, text):
+        for match in REGEX_ISRAELI_ID.finditer(text):
             val = match.group(1)
             found_identifiers.append(val)
             if val not in self.blacklist_ids:
@@ -154,10 +162,14 @@ class LocalSupplierDetector:
                         return best_code, best_conf, found_identifiers
 
         # Check Emails
-        # Case insensitive
-        emails = re.findall(REGEX_EMAIL, text)
-        for email in emails:
-            email_lower = email.lower()
+        # Case insensitive; each unique address is looked up once (headers/footers repeat them).
+        # Skip the (slowest) email regex sweep when the text cannot contain one.
+        seen_emails = set()
+        for match in REGEX_EMAIL.finditer(text) if "@" in text else ():
+            email_lower = match.group(0).lower()
+            if email_lower in seen_emails:
+                continue
+            seen_emails.add(email_lower)
             found_identifiers.append(email_lower)
             if not self._is_blacklisted_email(email_lower):
                 code = self.supplier_service.match_supplier(email=email_lower)
@@ -171,18 +183,21 @@ class LocalSupplierDetector:
 
     def _is_blacklisted_email(self, email: str) -> bool:
         """Checks if email is in blacklist OR matches a blacklisted domain (@domain.com)."""
-        if email in self.blacklist_emails:
+        if email in self._blacklist_exact:
             return True
+        at = email.rfind("@")
+        return at != -1 and email[at + 1 :] in self._blacklist_domains
 
-        # Check for domain wildcards
-        for blocked in self.blacklist_emails:
-            if blocked.startswith("@") and email.endswith(blocked):
-                return True
+    def _extract_text_pdf(self, file_path: str) -> str:
+        """Extracts text from FIRST page of PDF (PyMuPDF, falling back to pypdf)."""
+        try:
+            import fitz  # PyMuPDF
 
-        return False
+            with fitz.open(file_path) as doc:
+                return doc.load_page(0).get_text("text") if doc.page_count else ""
+        except Exception as e:
+            logger.debug(f"PyMuPDF extract failed for {file_path}, falling back to pypdf: {e}")
 
-    def _extract_text_pdf(self, file_path: str) -> str:
-        """Extracts text from FIRST page of PDF."""
         try:
             reader = PdfReader(file_path)
             if reader.pages:
@@ -193,18 +208,35 @@ class LocalSupplierDetector:
 
     def _extract_text_excel(self, file_path: str, mime_type: str) -> str:
         """Extracts text from Excel/CSV (limited to first few rows/cols for speed)."""
+        # Read first 20 rows to catch header/supplier info; the regex scan only needs raw text
         try:
-            # Read first 20 rows to catch header/supplier info
-            df = None
             if "csv" in mime_type.lower():
-                df = pd.read_csv(file_path, nrows=20, header=None)
-            else:
-                # default to excel for other mime types
-                df = pd.read_excel(file_path, nrows=20, header=None)
-
-            if df is not None:
-                # Convert to string blob
-                return df.to_string(index=False, header=False)
+                with open(file_path, encoding="utf-8", errors="ignore") as f:
+                    return "".join(islice(f, EXCEL_SCAN_ROWS))
+            if mime_type == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet":
+                return self._extract_text_xlsx(file_path)
+        except Exception as e:
+            logger.debug(f"Fast spreadsheet extract failed for {file_path}, falling back to pandas: {e}")
+
+        try:
+            # Legacy .xls (and anything openpyxl could not read) goes through pandas
+            import pandas as pd
+
+            df = pd.read_excel(file_path, nrows=EXCEL_SCAN_ROWS, header=None)
+            return df.to_string(index=False, header=False)
         except Exception as e:
             logger.warning(f"Excel extract error for {file_path}: {e}")
         return ""
+
+    @staticmethod
+    def _extract_text_xlsx(file_path: str) -> str:
+        """Joins the first rows of the active sheet using openpyxl's read-only mode."""
+        wb = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            ws = wb.active
+            # Read-only mode trusts the sheet's <dimension> tag, which some exporters leave at "A1"
+            ws.reset_dimensions()
+            rows = islice(ws.iter_rows(values_only=True), EXCEL_SCAN_ROWS)
+            return "\n".join(" ".join("" if v is None else str(v) for v in row) for row in rows)
+        finally:
+            wb.close()
@@ -1,23 +1,25 @@
+import functools
 import json
+import textwrap
 
 from src.extraction.schemas import calc_response_schema, raw_response_schema
 from src.shared.config import settings
 from src.shared.constants import VALIDATION_TOLERANCE, VAT_RATE
 
+# The schema embedded in the trial 2 prompt never changes at runtime, so serialize it once.
+# Compact separators: indentation whitespace only costs prompt tokens. Keys keep their declared
+# order (already deterministic) since the model tends to emit fields in schema order.
+CALC_RESPONSE_SCHEMA_JSON = json.dumps(calc_response_schema, separators=(",", ":"))
 
-def get_supplier_detection_prompt(filtered_email: str, invoice_context: str, suppliers_csv: str) -> str:
-    """
-    Returns the prompt for Phase 1: Supplier Detection.
-    """
-    prompt = f"""
-You are an expert at identifying suppliers from email communications and invoices.
-
-TASK: Analyze the email body and invoice below, then match to a supplier from our database.
+# --- Static prompt scaffolding (built once at import; only the variable slots are filled per call) ---
+# Indented blocks are dedented here so the source indentation does not reach the model as prompt tokens.
 
-EMAIL BODY:
-{filtered_email}
+# Phase 1 is split like Phase 2: instructions + supplier database first (identical across invoices until
+# the suppliers change, so Gemini's implicit prefix cache can reuse them), the per-invoice context last.
+_SUPPLIER_DETECTION_STATIC_TEMPLATE = """
+You are an expert at identifying suppliers from email communications and invoices.
 
-{invoice_context}
+TASK: Analyze the email body and invoice provided below, then match to a supplier from our database.
 
 SUPPLIER DATABASE (CSV format):
 {suppliers_csv}
@@ -33,8 +35,8 @@ INSTRUCTIONS:
 3. The supplier "קוד" (code) column is what you need to return.
 4. Prioritize matches from the invoice over email if there's a conflict.
 5. IGNORE OUR COMPANY: Never match ourselves as a supplier.
-   - Ignore IDs (H.P./Osek Murshe): {", ".join(settings.blacklist_ids)}
-   - Ignore Company Names: {", ".join(settings.blacklist_names)}
+   - Ignore IDs (H.P./Osek Murshe): {blacklist_ids}
+   - Ignore Company Names: {blacklist_names}
    - If a document contains both a supplier and our name (as the bill-to party), ALWAYS pick the OTHER party as the supplier.
 6. If you find a clear match, return the supplier code.
 7. If you cannot find a confident match, return "UNKNOWN".
@@ -53,45 +55,54 @@ INSTRUCTIONS:
 
 Output must strictly follow the defined schema.
 """
-    return prompt
-
 
-def get_invoice_extraction_prompt(
-    email_context: str = None,
-    supplier_instructions: str = None,
-    trial: int = 1,
-) -> str:
-    """
-    Returns the prompt for Phase 2: Invoice Extraction.
+_SUPPLIER_DETECTION_CONTEXT_TEMPLATE = """
+EMAIL BODY:
+{filtered_email}
 
-    Args:
-        email_context: Optional text from the email body.
-        supplier_instructions: Optional supplier-specific instructions.
-        trial: Which trial version to run (1 = Raw Data, 2 = LLM Calculated).
-    """
+{invoice_context}
+"""
 
-    if trial == 1:
-        return _get_invoice_extraction_prompt_trial_1(email_context, supplier_instructions)
-    elif trial == 2:
-        return _get_invoice_extraction_prompt_trial_2(email_context, supplier_instructions)
-    else:
-        raise ValueError(f"Unknown prompt trial version: {trial}")
+# Email context follows the supplier block as binding instructions; it is emitted once, at the end of the prompt
+_EMAIL_INSTRUCTIONS_TAIL_TEMPLATE = textwrap.dedent("""
 
+    🚨 EMAIL BODY INSTRUCTIONS (ABSOLUTE HIGHEST PRIORITY — overrides EVERYTHING above):
+    The sender may have included special one-time instructions in the email body.
+    Any instruction found in the email body OVERRIDES the supplier-specific instructions AND the general rules.
+    Re-read the email body carefully and apply any explicit instructions the sender wrote:
 
-def _get_invoice_extraction_prompt_trial_1(email_context: str, supplier_instructions: str) -> str:
-    """
-    Trial 1 Prompt (Raw Data Extraction).
-    Instructs the LLM NOT to do math. Just copy what is on the page.
-    """
-    prompt_text = ""
-    if email_context:
-        prompt_text += f"""
-    📧 CONTEXT FROM EMAIL BODY (read for reference — binding instructions below):
     {email_context}
-    
-    """
+    """)
 
-    prompt_text += """
+# Input handling shared by both extraction trials (raw PDF + page images)
+_DUAL_INPUT_RULE = """\
+    0. DUAL INPUT VALIDATION: You are receiving BOTH the original raw PDF and image renders of its pages. 
+       - Use the raw PDF text for fast structural processing.
+       - STRICTLY cross-reference with the provided images to confirm visual layout.
+       - The PDF OCR sometimes hallucinates or merges columns. The images are the ground truth for visual layout."""
+
+# Column sanity checks and line-item completeness rules shared by both trials
+_COLUMN_SANITY_RULES = """\
+       - CRITICAL: The 'quantity' (כמות) column should almost always contain INTEGER values. If you see decimal values (e.g. 29.90, 15.50) in what you think is the quantity column, it is LIKELY the 'price' column.
+       - COMMON SENSE: Use common sense to avoid swapping columns due to OCR shifts. Total Amount = Quantity * Price. If swapping them results in the same total, prioritize the column that contains integers as the 'quantity'.
+    2. EXTRACT EVERY SINGLE LINE ITEM. Do not summarize.
+    3. REPEATING ITEMS: If the same product appears in multiple rows, EXTRACT BOTH ROWS SEPARATELY."""
+
+# Barcode guidance shared by both trials
+_BARCODE_RULES = """\
+    *** IMPORTANT: BARCODE EXTRACTION ***
+    - Look for INTERNATIONAL BARCODE (EAN/GTIN), typically 13 digits.
+    - Prefer 12-14 digit numbers over short internal codes.
+    - If no barcode column exists, return null."""
+
+# Recalculation exceptions for the two document totals, stated once for both fields (shared by both trials)
+_TOTALS_BIG_EXCEPTION = """\
+       *** BIG EXCEPTION (The ONLY cases where you recalculate the document totals): ***
+       1. VAT CORRECTION: If the document states 17% VAT, it is a mistake. You MUST calculate 'document_total_with_vat' for 18% VAT instead.
+       2. MISSING GLOBAL DISCOUNT: If the SUPPLIER-SPECIFIC INSTRUCTIONS mention a global discount that is NOT explicitly shown or reflected in the document's printed totals, you MUST recalculate BOTH 'document_total_with_vat' and 'document_total_without_vat' to reflect it.
+       Otherwise, just copy both totals exactly as printed."""
+
+_TRIAL_1_BODY = textwrap.dedent(f"""
     You are an expert data extraction assistant for an Accounting team.
     Your job is to EXTRACT THE RAW DATA EXACTLY AS PRINTED on the document. Do NOT perform ANY calculations (unless specified in the BIG EXCEPTION below).
     Do NOT convert prices. Do NOT remove VAT. Do NOT adjust values. Just read what is written.
@@ -100,15 +111,9 @@ def _get_invoice_extraction_prompt_trial_1(email_context: str, supplier_instruct
     You MUST extract EACH order separately as its own object in the 'orders' list.
     
     CRITICAL EXTRACTION RULES:
-    0. DUAL INPUT VALIDATION: You are receiving BOTH the original raw PDF and image renders of its pages. 
-       - Use the raw PDF text for fast structural processing.
-       - STRICTLY cross-reference with the provided images to confirm visual layout.
-       - The PDF OCR sometimes hallucinates or merges columns. The images are the ground truth for visual layout.
+{_DUAL_INPUT_RULE}
     1. COLUMN IDENTIFICATION: Look closely at the header columns in the IMAGES to determine which field is 'quantity' (כמות), 'discount' (הנחה), and 'price' (מחיר). Do NOT be confused by other columns like "Total per row" (סה"כ), "Net total" or other calculated fields.
-       - CRITICAL: The 'quantity' (כמות) column should almost always contain INTEGER values. If you see decimal values (e.g. 29.90, 15.50) in what you think is the quantity column, it is LIKELY the 'price' column.
-       - COMMON SENSE: Use common sense to avoid swapping columns due to OCR shifts. Total Amount = Quantity * Price. If swapping them results in the same total, prioritize the column that contains integers as the 'quantity'.
-    2. EXTRACT EVERY SINGLE LINE ITEM. Do not summarize.
-    3. REPEATING ITEMS: If the same product appears in multiple rows, EXTRACT BOTH ROWS SEPARATELY.
+{_COLUMN_SANITY_RULES}
     4. 'vat_status': Look carefully at the price column headers and invoice totals. 
        - If you see "כולל מע"מ" (including VAT) or "כולל" in the price headers, you MUST return "INCLUDED".
        - If you see "לפני מע"מ" (excluding VAT) or it is not stated at all, return "EXCLUDED".
@@ -132,66 +137,31 @@ def _get_invoice_extraction_prompt_trial_1(email_context: str, supplier_instruct
     
     7. DOCUMENT TOTALS (For Validation):
        - 'document_total_with_vat': Extract the FINAL TOTAL to pay (סה"כ לתשלום).
-         *** BIG EXCEPTION (The ONLY cases where you recalculate this value): ***
-         1. VAT CORRECTION: If the document states 17% VAT, it is a mistake. You MUST calculate the total for 18% VAT instead.
-         2. MISSING GLOBAL DISCOUNT: If the SUPPLIER-SPECIFIC INSTRUCTIONS mention a global discount that is NOT explicitly shown or reflected in the document's printed totals, you MUST recalculate 'document_total_with_vat' to reflect it.
-         Otherwise, just copy the value exactly as printed.
        - 'document_total_without_vat': Extract the FINAL PRE-VAT TOTAL (סה"כ לפני מע"מ).
          - IMPORTANT: This field must represent the total AFTER any global discount but BEFORE VAT.
-         - *** BIG EXCEPTION: *** If the SUPPLIER-SPECIFIC INSTRUCTIONS mention a global discount that is NOT explicitly reflected in the document's printed totals, you MUST recalculate 'document_total_without_vat' to reflect it.
        - 'document_total_quantity': Extract TOTAL QUANTITY ONLY if explicitly printed on the document
          (e.g., "סה"כ כמות: 510"). If no total quantity line exists, return null. Do NOT sum up quantities yourself.
+{_TOTALS_BIG_EXCEPTION}
 
     8. 'notes': Use this field for any AI-GENERATED observations, explanations, or internal comments about your extraction process.
        - IMPORTANT: Do NOT copy general notes, shipping instructions, or terms already printed on the supplier's invoice. This field is for YOUR thoughts, not for document text.
        - If no specific observations are needed, leave this field as null or an empty string.
        - LANGUAGE REQUIREMENT: Return this field in Hebrew.
    
-    *** IMPORTANT: BARCODE EXTRACTION ***
-    - Look for INTERNATIONAL BARCODE (EAN/GTIN), typically 13 digits.
-    - Prefer 12-14 digit numbers over short internal codes.
-    - If no barcode column exists, return null.
+{_BARCODE_RULES}
 
     CRITICAL: Output ONLY the final JSON object. Do NOT include any preamble, conversational text, or explanations outside the JSON block.
-    """
+    """)
 
-    if supplier_instructions:
-        prompt_text += f"""
+_TRIAL_1_SUPPLIER_TEMPLATE = textwrap.dedent("""
     
     ⚠️ SUPPLIER-SPECIFIC OVERRIDES (HIGH PRIORITY — overrides general rules above):
     The following instructions are specific to THIS supplier. They override any conflicting general rules above,
     but are themselves overridden by any explicit instructions found in the EMAIL BODY (see below).
     {supplier_instructions}
-    """
-
-    if email_context:
-        prompt_text += f"""
-
-    🚨 EMAIL BODY INSTRUCTIONS (ABSOLUTE HIGHEST PRIORITY — overrides EVERYTHING above):
-    The sender may have included special one-time instructions in the email body.
-    Any instruction found in the email body OVERRIDES the supplier-specific instructions AND the general rules.
-    Re-read the email body carefully and apply any explicit instructions the sender wrote:
+    """)
 
-    {email_context}
-    """
-
-    return prompt_text
-
-
-def _get_invoice_extraction_prompt_trial_2(email_context: str, supplier_instructions: str) -> str:
-    """
-    Trial 2 Prompt (LLM Calculated Data).
-    Instructs the LLM to write code, do the math, and provide ONLY the final net prices.
-    """
-    prompt_text = ""
-    if email_context:
-        prompt_text += f"""
-    📧 CONTEXT FROM EMAIL BODY (read for reference — binding instructions below):
-    {email_context}
-    
-    """
-
-    prompt_text += f"""
+_TRIAL_2_BODY = textwrap.dedent(f"""
     You are an expert data extraction assistant for an Accounting team.
     
     ⚠️ PREVIOUS ATTEMPT FAILED. The mathematically calculated totals did not match the document total.
@@ -199,15 +169,9 @@ def _get_invoice_extraction_prompt_trial_2(email_context: str, supplier_instruct
     In this attempt, we need you to figure out the exact mathematical `final_net_price` for each item.
     
     CRITICAL INSTRUCTIONS:
-    0. DUAL INPUT VALIDATION: You are receiving BOTH the original raw PDF and image renders of its pages. 
-       - Use the raw PDF text for fast structural processing.
-       - STRICTLY cross-reference with the provided images to confirm visual layout.
-       - The PDF OCR sometimes hallucinates or merges columns. The images are the ground truth for visual layout.
+{_DUAL_INPUT_RULE}
     1. COLUMN IDENTIFICATION: Look closely at the header columns in the IMAGES to determine which field is 'quantity' (כמות), 'discount' (הנחה), and 'price' (מחיר). Do NOT be confused by other columns like "Total per row" (סה"כ שורה), "Net total" or other calculated fields.
-       - CRITICAL: The 'quantity' (כמות) column should almost always contain INTEGER values. If you see decimal values (e.g. 29.90, 15.50) in what you think is the quantity column, it is LIKELY the 'price' column.
-       - COMMON SENSE: Use common sense to avoid swapping columns due to OCR shifts. Total Amount = Quantity * Price. If swapping them results in the same total, prioritize the column that contains integers as the 'quantity'.
-    2. EXTRACT EVERY SINGLE LINE ITEM. Do not summarize.
-    3. REPEATING ITEMS: If the same product appears in multiple rows, EXTRACT BOTH ROWS SEPARATELY.
+{_COLUMN_SANITY_RULES}
     4. `final_net_price` CALCULATION REQUIREMENT:
        - You must determine the FINAL NET PRICE for each item. 
        - This means applying ALL line discounts, ALL global discounts (e.g. 15.25% if found or specified), and REMOVING VAT if the printed price included it.
@@ -217,13 +181,9 @@ def _get_invoice_extraction_prompt_trial_2(email_context: str, supplier_instruct
     *** VALIDATION COPY FIELDS (DO NOT CALCULATE) ***
     The following fields are for mathematical validation. You MUST copy them EXACTLY as printed on the document (unless specified in the BIG EXCEPTION below). Do NOT calculate them yourself.
     6. 'document_total_with_vat': COPY the FINAL TOTAL amount at the bottom of the invoice (סה"כ לתשלום).
-       *** BIG EXCEPTION (The ONLY cases where you recalculate this value): ***
-       1. VAT CORRECTION: If the document states 17% VAT, it is a mistake. You MUST calculate the total for 18% VAT instead.
-       2. MISSING GLOBAL DISCOUNT: If the SUPPLIER-SPECIFIC INSTRUCTIONS mention a global discount that is NOT explicitly shown or reflected in the document's printed totals, you MUST recalculate 'document_total_with_vat' to reflect it.
-       Otherwise, just copy the value exactly as printed.
     7. 'document_total_without_vat': COPY the FINAL PRE-VAT TOTAL (סה"כ לפני מע"מ).
        - IMPORTANT: This field must represent the total AFTER any global discount but BEFORE VAT.
-       - *** BIG EXCEPTION: *** If the SUPPLIER-SPECIFIC INSTRUCTIONS mention a global discount that is NOT explicitly reflected in the document's printed totals, you MUST recalculate 'document_total_without_vat' to reflect it.
+{_TOTALS_BIG_EXCEPTION}
     8. 'document_total_quantity': COPY the TOTAL QUANTITY ONLY if explicitly printed on the document.
     9. 'notes': Use this field for any AI-GENERATED observations, explanations, or internal comments about your extraction process or discrepancies you found.
        - IMPORTANT: Do NOT copy general notes, shipping instructions, or terms already printed on the supplier's invoice. This field is for YOUR thoughts, not for document text.
@@ -252,34 +212,172 @@ def _get_invoice_extraction_prompt_trial_2(email_context: str, supplier_instruct
     
     You MUST strictly follow this JSON schema for your final output:
     ```json
-    {json.dumps(calc_response_schema, indent=2)}
+    {CALC_RESPONSE_SCHEMA_JSON}
     ```
 
-    *** IMPORTANT: BARCODE EXTRACTION ***
-    - Look for INTERNATIONAL BARCODE (EAN/GTIN), typically 13 digits.
-    - Prefer 12-14 digit numbers over short internal codes.
-    - If no barcode column exists, return null.
-    """
+{_BARCODE_RULES}
+    """)
 
-    if supplier_instructions:
-        prompt_text += f"""
+_TRIAL_2_SUPPLIER_TEMPLATE = textwrap.dedent("""
     
     ⚠️ SUPPLIER-SPECIFIC OVERRIDES (HIGH PRIORITY — overrides general rules above):
     The following instructions are specific to THIS supplier and OVERRIDE any conflicting general rules above.
     They are themselves overridden by any explicit instructions found in the EMAIL BODY (see below).
     
     {supplier_instructions}
+    """)
+
+
+def _split_template(template: str, *slots: str) -> tuple[str, ...]:
+    """
+    Splits a template around its `{slot}` placeholders (given in order of appearance).
+
+    Prompts are then assembled with a single "".join of the static pieces and the per-call values,
+    instead of re-parsing the template with str.format on every call.
+    """
+    pieces = []
+    rest = template
+    for slot in slots:
+        head, found, rest = rest.partition("{" + slot + "}")
+        if not found:
+            raise ValueError(f"Template slot {{{slot}}} not found")
+        pieces.append(head)
+    pieces.append(rest)
+    return tuple(pieces)
+
+
+_SUPPLIER_PROMPT_HEAD, _SUPPLIER_PROMPT_AFTER_CSV, _SUPPLIER_PROMPT_AFTER_IDS, _SUPPLIER_PROMPT_TAIL = _split_template(
+    _SUPPLIER_DETECTION_STATIC_TEMPLATE, "suppliers_csv", "blacklist_ids", "blacklist_names"
+)
+_SUPPLIER_CONTEXT_HEAD, _SUPPLIER_CONTEXT_AFTER_EMAIL, _SUPPLIER_CONTEXT_TAIL = _split_template(
+    _SUPPLIER_DETECTION_CONTEXT_TEMPLATE, "filtered_email", "invoice_context"
+)
+_EMAIL_INSTRUCTIONS_TAIL = _split_template(_EMAIL_INSTRUCTIONS_TAIL_TEMPLATE, "email_context")
+_TRIAL_1_SUPPLIER_BLOCK = _split_template(_TRIAL_1_SUPPLIER_TEMPLATE, "supplier_instructions")
+_TRIAL_2_SUPPLIER_BLOCK = _split_template(_TRIAL_2_SUPPLIER_TEMPLATE, "supplier_instructions")
+
+
+@functools.cache
+def _blacklist_prompt_values() -> tuple[str, str]:
+    """
+    Joined blacklist IDs and company names for the supplier prompt.
+
+    Built on first use: the blacklists are settings values that only change on restart.
+    """
+    return ", ".join(settings.blacklist_ids), ", ".join(settings.blacklist_names)
+
+
+def get_supplier_detection_prompt(filtered_email: str, invoice_context: str, suppliers_csv: str) -> str:
+    """
+    Returns the prompt for Phase 1: Supplier Detection.
+    """
+    return "".join(get_supplier_detection_prompt_parts(filtered_email, invoice_context, suppliers_csv))
+
+
+def get_supplier_detection_prompt_parts(
+    filtered_email: str, invoice_context: str, suppliers_csv: str
+) -> tuple[str, str]:
+    """
+    Returns the Phase 1 prompt split into (static_instructions, invoice_context).
+
+    The static part (instructions, supplier database, blacklists) only changes when the suppliers do,
+    so it is sent first for implicit prefix caching; the email/invoice context goes after the
+    attached invoice file.
+    """
+    blacklist_ids, blacklist_names = _blacklist_prompt_values()
+    static = "".join(
+        (
+            _SUPPLIER_PROMPT_HEAD,
+            suppliers_csv,
+            _SUPPLIER_PROMPT_AFTER_CSV,
+            blacklist_ids,
+            _SUPPLIER_PROMPT_AFTER_IDS,
+            blacklist_names,
+            _SUPPLIER_PROMPT_TAIL,
+        )
+    )
+    context = "".join(
+        (
+            _SUPPLIER_CONTEXT_HEAD,
+            filtered_email,
+            _SUPPLIER_CONTEXT_AFTER_EMAIL,
+            invoice_context,
+            _SUPPLIER_CONTEXT_TAIL,
+        )
+    )
+    return static, context
+
+
+def get_invoice_extraction_prompt(
+    email_context: str = None,
+    supplier_instructions: str = None,
+    trial: int = 1,
+) -> str:
+    """
+    Returns the prompt for Phase 2: Invoice Extraction.
+
+    Args:
+        email_context: Optional text from the email body.
+        supplier_instructions: Optional supplier-specific instructions.
+        trial: Which trial version to run (1 = Raw Data, 2 = LLM Calculated).
+    """
+    return "".join(get_invoice_extraction_prompt_parts(email_context, supplier_instructions, trial))
+
+
+def get_invoice_extraction_prompt_parts(
+    email_context: str = None,
+    supplier_instructions: str = None,
+    trial: int = 1,
+) -> tuple[str, str]:
+    """
+    Returns the Phase 2 prompt split into (static_instructions, dynamic_context).
+
+    The static part is byte-identical for every call of a given trial, so sending it as the
+    first request part lets Gemini's implicit prefix caching reuse it across invoices (the cache
+    needs a prefix of at least ~1024 tokens; both trial bodies are above that). The dynamic part
+    holds the email and supplier blocks and is empty when neither is given.
+
+    Args:
+        email_context: Optional text from the email body.
+        supplier_instructions: Optional supplier-specific instructions.
+        trial: Which trial version to run (1 = Raw Data, 2 = LLM Calculated).
     """
+    builder = _EXTRACTION_PROMPT_BUILDERS.get(trial)
+    if builder is None:
+        raise ValueError(f"Unknown prompt trial version: {trial}")
+    return builder(email_context, supplier_instructions)
+
 
+def _build_dynamic_context(
+    supplier_block: tuple[str, str], email_context: str | None, supplier_instructions: str | None
+) -> str:
+    """Joins the optional email/supplier blocks that follow the static instructions."""
+    parts = []
+    if supplier_instructions:
+        parts += (supplier_block[0], supplier_instructions, supplier_block[1])
     if email_context:
-        prompt_text += f"""
+        parts += (_EMAIL_INSTRUCTIONS_TAIL[0], email_context, _EMAIL_INSTRUCTIONS_TAIL[1])
+    return "".join(parts)
 
-    🚨 EMAIL BODY INSTRUCTIONS (ABSOLUTE HIGHEST PRIORITY — overrides EVERYTHING above):
-    The sender may have included special one-time instructions in the email body.
-    Any instruction found in the email body OVERRIDES the supplier-specific instructions AND the general rules.
-    Re-read the email body carefully and apply any explicit instructions the sender wrote:
 
-    {email_context}
+def _get_invoice_extraction_prompt_trial_1(email_context: str, supplier_instructions: str) -> tuple[str, str]:
     """
+    Trial 1 Prompt (Raw Data Extraction).
+    Instructs the LLM NOT to do math. Just copy what is on the page.
+    """
+    return _TRIAL_1_BODY, _build_dynamic_context(_TRIAL_1_SUPPLIER_BLOCK, email_context, supplier_instructions)
+
+
+def _get_invoice_extraction_prompt_trial_2(email_context: str, supplier_instructions: str) -> tuple[str, str]:
+    """
+    Trial 2 Prompt (LLM Calculated Data).
+    Instructs the LLM to write code, do the math, and provide ONLY the final net prices.
+    """
+    return _TRIAL_2_BODY, _build_dynamic_context(_TRIAL_2_SUPPLIER_BLOCK, email_context, supplier_instructions)
+
 
-    return prompt_text
+# The static bodies are prebuilt constants; only the short per-invoice context is joined per call
+_EXTRACTION_PROMPT_BUILDERS = {
+    1: _get_invoice_extraction_prompt_trial_1,
+    2: _get_invoice_extraction_prompt_trial_2,
+}
@@ -93,3 +93,9 @@ supplier_detection_schema = {
     },
     "required": ["supplier_code", "confidence", "reasoning"],
 }
+
+# Response schemas validated into SDK objects once at import; passing these instead of the dicts
+# spares GenerateContentConfig a re-validation of the nested schema on every request.
+# The dicts above stay the source of truth (they are also embedded in prompts and cache keys).
+RAW_RESPONSE_SCHEMA = types.Schema.model_validate(raw_response_schema)
+SUPPLIER_DETECTION_SCHEMA = types.Schema.model_validate(supplier_detection_schema)
@@ -1,5 +1,5 @@
 from .client import generate_content_safe, init_client, is_retryable_error
-from .excel_fallback import read_excel_safe, read_xlsx_via_xml
+from .excel_fallback import read_excel_as_csv, read_excel_safe, read_xlsx_via_xml
 from .phase1_supplier import detect_supplier, filter_email_context, load_suppliers_csv
 from .phase2_extraction import extract_invoice_data
 from .types import InvoiceExtractionResult, SupplierDetectionResult
@@ -12,6 +12,7 @@ __all__ = [
     "extract_invoice_data",
     "filter_email_context",
     "load_suppliers_csv",
+    "read_excel_as_csv",
     "read_excel_safe",
     "read_xlsx_via_xml",
     "SupplierDetectionResult",
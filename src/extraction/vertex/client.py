@@ -1,7 +1,9 @@
+import hashlib
 import logging
+import os
 
 from google import genai
-from google.genai import errors
+from google.genai import errors, types
 from tenacity import before_sleep_log, retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 from src.shared.config import settings
@@ -71,22 +73,59 @@ def is_retryable_error(exception):
         code = getattr(exception, "code", None) or getattr(exception, "status_code", None)
         if code == 429:
             return True
-        if "429" in str(exception) or "RESOURCE_EXHAUSTED" in str(exception):
+        message = str(exception)
+        if "429" in message or "RESOURCE_EXHAUSTED" in message:
             return True
     return False
 
 
+def generate_content_safe(model, contents, config):
+    """
+    Resilient wrapper around `generate_content` with retry semantics for transient failures.
+
+    When GEMINI_RESPONSE_CACHE_DIR is set (local development only; ignored in the cloud runtime),
+    responses are stored on disk keyed by the full request, so re-running the pipeline on the same
+    inputs replays them instead of calling the model. Replayed responses keep their usage metadata.
+    """
+    cache_path = _response_cache_path(model, contents, config)
+    if cache_path and os.path.exists(cache_path):
+        logger.info(f"Replaying cached Gemini response {os.path.basename(cache_path)}")
+        with open(cache_path, encoding="utf-8") as f:
+            return types.GenerateContentResponse.model_validate_json(f.read())
+
+    response = _generate_content_with_retry(model, contents, config)
+
+    if cache_path:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path, "w", encoding="utf-8") as f:
+                f.write(response.model_dump_json(exclude_none=True))
+        except Exception as e:
+            logger.warning(f"Could not write Gemini response cache {cache_path}: {e}")
+    return response
+
+
 @retry(
     retry=retry_if_exception(is_retryable_error),
     stop=stop_after_attempt(8),
     wait=wait_exponential(multiplier=2, min=4, max=120),
     before_sleep=before_sleep_log(logger, logging.WARNING),
 )
-def generate_content_safe(model, contents, config):
-    """
-    Resilient wrapper around `generate_content` with retry semantics for transient failures.
-    """
+def _generate_content_with_retry(model, contents, config):
     if not _client:
         raise ValueError("Client not initialized")
 
     return _client.models.generate_content(model=model, contents=contents, config=config)
+
+
+def _response_cache_path(model, contents, config) -> str | None:
+    """Disk location of the dev response cache entry for a request, or None when the cache is off."""
+    cache_dir = settings.GEMINI_RESPONSE_CACHE_DIR
+    if not cache_dir or settings.is_cloud_runtime:
+        return None
+
+    h = hashlib.sha256(model.encode())
+    for part in contents:
+        h.update(part.model_dump_json(exclude_none=True).encode())
+    h.update(config.model_dump_json(exclude_none=True).encode())
+    return os.path.join(cache_dir, f"{h.hexdigest()}.json")
@@ -1,57 +1,140 @@
+from __future__ import annotations
+
+import csv
+import functools
+import io
+import os
 import xml.etree.ElementTree as ET
 import zipfile
+from datetime import datetime, time
+from typing import TYPE_CHECKING
 
 import openpyxl
-import pandas as pd
 
 from src.shared.logger import get_logger
 
+# pandas is only needed by the fallback readers, which import it themselves so that
+# loading this module (and every cold start) does not pay for it
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = get_logger(__name__)
 
+# Recently converted spreadsheets kept in memory (see read_excel_as_csv)
+EXCEL_CSV_CACHE_SIZE = 4
+
 
 def read_excel_safe(file_path: str) -> pd.DataFrame:
     """
     Robust Excel reader with layered fallbacks for malformed XLSX files.
+
+    openpyxl's read-only streaming reader goes first (no styles or full workbook model);
+    legacy .xls and files it rejects fall back to pandas, then to raw XML parsing.
     """
+    try:
+        return _read_excel_openpyxl(file_path)
+    except Exception as e:
+        logger.warning(f"Read-only openpyxl read failed: {e}. Attempting fallback with pd.read_excel...")
+        return _read_excel_fallbacks(file_path)
+
+
+def _read_excel_openpyxl(file_path: str) -> pd.DataFrame:
+    """Reads the first sheet with openpyxl in read-only mode, using the first row as the header."""
+    import pandas as pd
+
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = _sheet_rows(wb.active)
+        header = rows[0] if rows else ()
+        columns = [f"Unnamed: {i}" if col is None else col for i, col in enumerate(header)]
+        return pd.DataFrame.from_records(rows[1:], columns=columns)
+    finally:
+        wb.close()
+
+
+def _read_excel_fallbacks(file_path: str) -> pd.DataFrame:
+    """pd.read_excel, then raw XML parsing, for files the read-only openpyxl reader cannot open."""
+    import pandas as pd
+
     try:
         return pd.read_excel(file_path)
     except Exception as e:
-        logger.warning(f"Standard pd.read_excel failed: {e}. Attempting fallback with openpyxl...")
+        logger.error(f"Fallback Excel read (pandas) failed: {e}")
+        logger.info("Attempting Level 3 Fallback: Raw XML Parsing...")
         try:
-            wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
-            try:
-                ws = wb.active
-                data = ws.values
-                columns = next(data)
-                df = pd.DataFrame(data, columns=columns)
-                logger.info("Fallback Excel read successful.")
-                return df
-            finally:
-                wb.close()
-        except Exception as fallback_e:
-            logger.error(f"Fallback Excel read (openpyxl) failed: {fallback_e}")
-            logger.info("Attempting Level 3 Fallback: Raw XML Parsing...")
-            try:
-                return read_xlsx_via_xml(file_path)
-            except Exception as xml_e:
-                logger.error(f"Level 3 XML read failed: {xml_e}")
-                raise e from xml_e
+            return read_xlsx_via_xml(file_path)
+        except Exception as xml_e:
+            logger.error(f"Level 3 XML read failed: {xml_e}")
+            raise e from xml_e
+
+
+def _sheet_rows(ws) -> list[tuple]:
+    """
+    All rows of a read-only worksheet, padded to a common width.
+
+    Read-only mode trusts the sheet's <dimension> tag, which some exporters leave at "A1", so the
+    dimensions are recomputed from the cells. Rows then come back without their trailing empty cells.
+    """
+    ws.reset_dimensions()
+    rows = list(ws.iter_rows(values_only=True))
+    width = max(map(len, rows), default=0)
+    return [row + (None,) * (width - len(row)) for row in rows]
+
+
+def _csv_cell(value):
+    """Date-only cells as plain dates, like pandas' CSV output (saves the '00:00:00' tokens)."""
+    if isinstance(value, datetime) and value.time() == time.min:
+        return value.date()
+    return value
+
+
+def read_excel_as_csv(file_path: str) -> str:
+    """
+    Converts the first sheet of an Excel file to CSV text for the LLM.
+
+    The result is reused while the file is unchanged (same mtime and size), so Phase 1 and
+    both Phase 2 trials convert an invoice once per pipeline run.
+    """
+    stat = os.stat(file_path)
+    return _read_excel_as_csv(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=EXCEL_CSV_CACHE_SIZE)
+def _read_excel_as_csv(file_path: str, mtime_ns: int, size: int) -> str:
+    """
+    Uncached conversion behind read_excel_as_csv.
+
+    Streams rows from openpyxl's read-only reader straight into csv.writer, skipping the DataFrame
+    (and its dtype inference) entirely. Fully empty rows are dropped. Files openpyxl cannot open
+    (legacy .xls, malformed XLSX) go through the pandas and raw XML fallbacks instead.
+    """
+    try:
+        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            for row in _sheet_rows(wb.active):
+                if any(value is not None for value in row):
+                    writer.writerow([_csv_cell(value) for value in row])
+            return buffer.getvalue()
+        finally:
+            wb.close()
+    except Exception as e:
+        logger.warning(f"Streaming Excel read failed: {e}. Falling back to pd.read_excel...")
+        return _read_excel_fallbacks(file_path).to_csv(index=False)
 
 
 def read_xlsx_via_xml(file_path: str) -> pd.DataFrame:
     """
     Parses an XLSX by reading the XML files directly, bypassing style validation.
     """
+    import pandas as pd
+
     with zipfile.ZipFile(file_path, "r") as z:
         shared_strings = []
         if "xl/sharedStrings.xml" in z.namelist():
             with z.open("xl/sharedStrings.xml") as f:
-                tree = ET.parse(f)
-                root = tree.getroot()
-                for si in root.findall(".//{*}si"):
-                    text_nodes = si.findall(".//{*}t")
-                    text = "".join(node.text or "" for node in text_nodes)
-                    shared_strings.append(text)
+                shared_strings = _read_shared_strings(f)
 
         sheet_path = None
         for name in z.namelist():
@@ -65,62 +148,124 @@ def read_xlsx_via_xml(file_path: str) -> pd.DataFrame:
         logger.info(f"Parsing raw XML from {sheet_path}...")
 
         data_rows = []
+        # Width from <dimension ref="A1:K40"> (written before the rows); 0 if missing
+        ncols = 0
+        max_cols = 0
         with z.open(sheet_path) as f:
-            context = ET.iterparse(f, events=("end",))
+            sheet_data = None
             current_row = []
+            next_col = 0
+
+            for event, elem in ET.iterparse(f, events=("start", "end")):
+                tag = elem.tag.rpartition("}")[2]
+                if event == "start":
+                    if tag == "row":
+                        current_row = [None] * ncols
+                        next_col = 0
+                    elif tag == "sheetData":
+                        sheet_data = elem
+                    continue
 
-            for _event, elem in context:
-                if elem.tag.endswith("row"):
+                if tag == "c":
+                    # Excel omits empty cells, so place each cell by its reference ("C5") when present
+                    col = _column_index(elem.get("r"))
+                    if col is None:
+                        col = next_col
+                    if col >= len(current_row):
+                        current_row.extend([None] * (col + 1 - len(current_row)))
+                    current_row[col] = _xml_cell_value(elem, shared_strings)
+                    next_col = col + 1
+                elif tag == "row":
                     data_rows.append(current_row)
-                    current_row = []
+                    max_cols = max(max_cols, len(current_row))
+                    # Drop the finished row from the tree so memory stays flat on large sheets
                     elem.clear()
-                elif elem.tag.endswith("c"):
-                    cell_type = elem.get("t")
-                    cell_value = None
-
-                    v_node = elem.find(".//{*}v")
-                    if v_node is not None and v_node.text:
-                        val = v_node.text
-                        if cell_type == "s":
-                            try:
-                                idx = int(val)
-                                cell_value = shared_strings[idx] if idx < len(shared_strings) else val
-                            except Exception:
-                                cell_value = val
-                        elif cell_type == "b":
-                            cell_value = val == "1"
-                        else:
-                            try:
-                                cell_value = float(val) if "." in val else int(val)
-                            except Exception:
-                                cell_value = val
-
-                    if cell_value is None and cell_type == "inlineStr":
-                        t_node = elem.find(".//{*}is/{*}t")
-                        if t_node is not None:
-                            cell_value = t_node.text
-
-                    current_row.append(cell_value)
+                    if sheet_data is not None:
+                        sheet_data.remove(elem)
+                elif tag == "dimension":
+                    last_col = _column_index(elem.get("ref", "").rpartition(":")[2])
+                    ncols = last_col + 1 if last_col is not None else 0
 
     if not data_rows:
         return pd.DataFrame()
 
-    max_cols = max(len(r) for r in data_rows)
-    normalized_data = []
-    for row in data_rows:
-        padding = [None] * (max_cols - len(row))
-        normalized_data.append(row + padding)
-
     logger.info(f"Level 3 XML extraction successful. Max columns: {max_cols}")
 
-    header_row = normalized_data[0]
-    data_body = normalized_data[1:]
+    # Rows are pre-sized from the dimension; only a missing or understated one leaves rows to pad
+    if max_cols > ncols:
+        for row in data_rows:
+            if len(row) < max_cols:
+                row.extend([None] * (max_cols - len(row)))
 
-    columns = []
-    for i, col in enumerate(header_row):
-        if col is None:
-            columns.append(f"Unnamed: {i}")
-        else:
-            columns.append(str(col))
+    header_row = data_rows[0]
+    columns = [f"Unnamed: {i}" if col is None else str(col) for i, col in enumerate(header_row)]
+
+    return pd.DataFrame(data_rows[1:], columns=columns)
+
+
+def _read_shared_strings(f) -> list[str]:
+    """Streams the <si> entries of sharedStrings.xml, keeping only one entry in the tree at a time."""
+    shared_strings = []
+    sst = None
+    for event, elem in ET.iterparse(f, events=("start", "end")):
+        tag = elem.tag.rpartition("}")[2]
+        if event == "start":
+            if tag == "sst":
+                sst = elem
+        elif tag == "si":
+            shared_strings.append("".join(node.text or "" for node in elem.iterfind(".//{*}t")))
+            elem.clear()
+            if sst is not None:
+                sst.remove(elem)
+    return shared_strings
+
+
+# Column letter -> 1-based digit of the base-26 column number (one dict hit per letter)
+_COLUMN_LETTER_VALUES = {
+    **{chr(ord("A") + i): i + 1 for i in range(26)},
+    **{chr(ord("a") + i): i + 1 for i in range(26)},
+}
+
+
+def _column_index(cell_ref: str | None) -> int | None:
+    """Zero-based column index of a cell reference like "AB12", or None if missing."""
+    if not cell_ref:
+        return None
+    index = 0
+    for ch in cell_ref:
+        value = _COLUMN_LETTER_VALUES.get(ch)
+        if value is None:
+            break
+        index = index * 26 + value
+    return index - 1 if index else None
+
+
+def _xml_cell_value(cell: ET.Element, shared_strings: list[str]):
+    """Decodes a worksheet <c> element (shared string, boolean, number or inline string)."""
+    cell_type = cell.get("t")
+    value_text = None
+    inline_text = None
+    for child in cell:
+        child_tag = child.tag.rpartition("}")[2]
+        if child_tag == "v":
+            value_text = child.text
+        elif child_tag == "is":
+            inline_text = "".join(node.text or "" for node in child.iter() if node.tag.rpartition("}")[2] == "t")
+
+    if value_text:
+        if cell_type == "s":
+            try:
+                idx = int(value_text)
+                return shared_strings[idx] if idx < len(shared_strings) else value_text
+            except Exception:
+                return value_text
+        if cell_type == "b":
+            return value_text == "1"
+        try:
+            return float(value_text) if "." in value_text else int(value_text)
+        except Exception:
+            return value_text
 
-    return pd.DataFrame(data_body, columns=columns)
+    if cell_type == "inlineStr":
+        return inline_text
+    return None
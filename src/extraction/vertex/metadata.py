@@ -16,6 +16,8 @@ def extract_response_metadata(response) -> dict:
             "prompt_token_count": getattr(raw_usage, "prompt_token_count", 0),
             "candidates_token_count": getattr(raw_usage, "candidates_token_count", 0),
             "total_token_count": getattr(raw_usage, "total_token_count", 0),
+            # Prompt tokens served from Gemini's (implicit) context cache
+            "cached_content_token_count": getattr(raw_usage, "cached_content_token_count", 0),
         }
 
     if response.candidates and len(response.candidates) > 0:
@@ -1,20 +1,20 @@
+import functools
 import json
 import os
 import re
 
-import pandas as pd
 from google.genai import types
 
-from src.extraction.prompts import get_supplier_detection_prompt
-from src.extraction.schemas import supplier_detection_schema
+from src.extraction.prompts import get_supplier_detection_prompt_parts
+from src.extraction.schemas import SUPPLIER_DETECTION_SCHEMA
 from src.shared.ai_cost import calculate_cost
 from src.shared.config import settings
 from src.shared.constants import SUPPLIER_DETECTION_MODEL
 from src.shared.logger import get_logger
-from src.shared.utils import get_mime_type, is_excel_file
+from src.shared.utils import get_mime_type, is_excel_file, read_file_bytes
 
 from .client import generate_content_safe
-from .excel_fallback import read_excel_safe
+from .excel_fallback import read_excel_as_csv
 from .metadata import extract_response_metadata
 from .types import SupplierDetectionResult
 
@@ -23,6 +23,28 @@ logger = get_logger(__name__)
 SUPPLIERS_EXCEL_PATH = os.path.join(os.path.dirname(__file__), "../../../data-excel/suppliers.xlsx")
 
 
+@functools.cache
+def _excluded_emails_pattern() -> re.Pattern | None:
+    """
+    One case-insensitive pattern covering every excluded entry, built on first use.
+    Wildcard domains ('@domain') match any address at that domain; other entries match literally.
+    Longer entries are tried first so an entry never pre-empts a longer one it is a prefix of.
+    """
+    entries = sorted({entry.strip() for entry in settings.excluded_emails} - {""}, key=lambda e: (-len(e), e))
+    domains = [re.escape(entry) for entry in entries if entry.startswith("@")]
+    exact = [re.escape(entry) for entry in entries if not entry.startswith("@")]
+
+    alternatives = []
+    if domains:
+        alternatives.append(r"(?P<domain>\b[A-Za-z0-9._%+-]+(?:" + "|".join(domains) + r")\b)")
+    alternatives.extend(exact)
+    return re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+
+
+def _filtered_placeholder(match: re.Match) -> str:
+    return "[FILTERED_DOMAIN]" if match.lastgroup == "domain" else "[FILTERED]"
+
+
 def filter_email_context(email_text: str) -> str:
     """
     Filter excluded emails from email context so internal addresses don't bias detection.
@@ -31,38 +53,25 @@ def filter_email_context(email_text: str) -> str:
     if not email_text:
         return ""
 
-    filtered_text = email_text
-    for excluded_entry in settings.excluded_emails:
-        excluded_entry = excluded_entry.strip()
-        if not excluded_entry:
-            continue
-
-        if excluded_entry.startswith("@"):
-            domain_pattern = re.escape(excluded_entry)
-            full_pattern = r"\b[A-Za-z0-9._%+-]+" + domain_pattern + r"\b"
-            pattern = re.compile(full_pattern, re.IGNORECASE)
-            filtered_text = pattern.sub("[FILTERED_DOMAIN]", filtered_text)
-        else:
-            pattern = re.compile(re.escape(excluded_entry), re.IGNORECASE)
-            filtered_text = pattern.sub("[FILTERED]", filtered_text)
-
-    return filtered_text
+    pattern = _excluded_emails_pattern()
+    if pattern is None:
+        return email_text
+    return pattern.sub(_filtered_placeholder, email_text)
 
 
 def load_suppliers_csv() -> str:
     """
     Deprecated fallback: load suppliers from local Excel and return CSV text.
     Preferred source is SupplierService.get_suppliers_csv().
+
+    Streamed straight to CSV (no DataFrame) and reused until the file changes.
     """
     try:
         if not os.path.exists(SUPPLIERS_EXCEL_PATH):
             logger.warning(f"Warning: Suppliers Excel not found at {SUPPLIERS_EXCEL_PATH}")
             return ""
 
-        df = pd.read_excel(SUPPLIERS_EXCEL_PATH)
-        csv_text = df.to_csv(index=False)
-        logger.info(f"Loaded {len(df)} suppliers from Excel for LLM context")
-        return csv_text
+        return read_excel_as_csv(SUPPLIERS_EXCEL_PATH)
     except Exception as e:
         logger.error(f"Error loading suppliers Excel: {e}")
         return ""
@@ -87,10 +96,9 @@ def detect_supplier(
     # Load suppliers from SupplierService (Firestore) if not provided
     if suppliers_csv is None:
         try:
-            from src.data.supplier_service import SupplierService
+            from src.data.supplier_service import get_supplier_service
 
-            supplier_service = SupplierService()
-            suppliers_csv = supplier_service.get_suppliers_csv()
+            suppliers_csv = get_supplier_service().get_suppliers_csv()
         except Exception as e:
             logger.warning(f"Warning: Could not load from SupplierService: {e}")
             suppliers_csv = load_suppliers_csv()
@@ -99,7 +107,7 @@ def detect_supplier(
         logger.warning("Warning: No supplier data available for matching")
         return ("UNKNOWN", 0.0, 0.0, "", {}, None, None)
 
-    content_parts = []
+    file_parts = []
     invoice_context = ""
 
     if invoice_file_path and os.path.exists(invoice_file_path):
@@ -110,16 +118,14 @@ def detect_supplier(
 
         if is_excel_file(invoice_mime_type):
             try:
-                df = read_excel_safe(invoice_file_path)
-                excel_csv = df.to_csv(index=False)
+                excel_csv = read_excel_as_csv(invoice_file_path)
                 invoice_context = f"INVOICE DATA (Excel converted to CSV):\n{excel_csv}"
             except Exception as e:
                 logger.warning(f"Warning: Could not read Excel for Phase 1: {e}")
         elif "pdf" in invoice_mime_type.lower():
             try:
-                with open(invoice_file_path, "rb") as f:
-                    file_data = f.read()
-                content_parts.append(types.Part.from_bytes(data=file_data, mime_type="application/pdf"))
+                file_data = read_file_bytes(invoice_file_path)
+                file_parts.append(types.Part.from_bytes(data=file_data, mime_type="application/pdf"))
                 invoice_context = "[Invoice PDF attached above]"
             except Exception as e:
                 logger.warning(f"Warning: Could not attach PDF: {e}")
@@ -129,8 +135,14 @@ def detect_supplier(
                 "Attempting default PDF handling."
             )
 
-    prompt = get_supplier_detection_prompt(filtered_email, invoice_context, suppliers_csv)
-    content_parts.append(types.Part.from_text(text=prompt))
+    static_prompt, context_prompt = get_supplier_detection_prompt_parts(filtered_email, invoice_context, suppliers_csv)
+    # Instructions + supplier database first so the shared prefix can hit Gemini's implicit cache,
+    # then the invoice file, then the per-invoice email/invoice context
+    content_parts = [
+        types.Part.from_text(text=static_prompt),
+        *file_parts,
+        types.Part.from_text(text=context_prompt),
+    ]
 
     model_name = SUPPLIER_DETECTION_MODEL
     logger.info(f"{trace_context}>>> Phase 1: Starting Supplier Detection using {model_name}...")
@@ -145,13 +157,13 @@ def detect_supplier(
             contents=[types.Content(role="user", parts=content_parts)],
             config=types.GenerateContentConfig(
                 response_mime_type="application/json",
-                response_schema=supplier_detection_schema,
+                response_schema=SUPPLIER_DETECTION_SCHEMA,
                 temperature=0.0,
             ),
         )
 
-        raw_json = response.text.replace("```json", "").replace("```", "").strip()
-        result = json.loads(raw_json)
+        # response_schema constrains the output to bare JSON; no markdown fences to strip
+        result = json.loads(response.text)
 
         supplier_code = result.get("supplier_code", "UNKNOWN")
         confidence = result.get("confidence", 0.0)
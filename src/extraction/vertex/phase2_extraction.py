@@ -1,23 +1,27 @@
 import json
 import os
+import re
 
 from google.genai import types
 
-from src.extraction.prompts import get_invoice_extraction_prompt
-from src.extraction.schemas import raw_response_schema
+from src.extraction.prompts import get_invoice_extraction_prompt_parts
+from src.extraction.schemas import RAW_RESPONSE_SCHEMA
 from src.shared.ai_cost import calculate_cost
 from src.shared.constants import EXTRACTION_MODEL_TRIAL_1, EXTRACTION_MODEL_TRIAL_2
 from src.shared.logger import get_logger
 from src.shared.models import MultiOrderResponse
-from src.shared.utils import convert_pdf_bytes_to_images, get_mime_type, is_excel_file
+from src.shared.utils import convert_pdf_bytes_to_images, get_mime_type, is_excel_file, read_file_bytes
 
 from .client import generate_content_safe
-from .excel_fallback import read_excel_safe
+from .excel_fallback import read_excel_as_csv
 from .metadata import extract_response_metadata
 from .types import InvoiceExtractionResult
 
 logger = get_logger(__name__)
 
+# First ```json block, up to its closing fence (or the end of the text if the model never closed it)
+_JSON_FENCE_RE = re.compile(r"```json(.*?)(?:```|$)", re.DOTALL)
+
 
 def _truncate_for_log(text: str, limit: int = 2000) -> str:
     """Trim verbose model output to a safe logging size."""
@@ -27,6 +31,16 @@ def _truncate_for_log(text: str, limit: int = 2000) -> str:
     return text if len(text) <= limit else f"{text[:limit]}...[truncated]"
 
 
+def _strip_json_fence(text: str) -> str:
+    """Extracts the JSON payload from a free-text answer that wraps it in a markdown block."""
+    if "```" not in text:
+        return text.strip()
+    match = _JSON_FENCE_RE.search(text)
+    if match:
+        return match.group(1).strip()
+    return text.replace("```", "").strip()
+
+
 def extract_invoice_data(
     file_path: str,
     mime_type: str = None,
@@ -42,7 +56,7 @@ def extract_invoice_data(
         (orders_list, phase2_cost, response_metadata, parsed_raw_response)
     """
     trial_version = 1 if retry_count == 0 else 2
-    prompt_text = get_invoice_extraction_prompt(
+    static_prompt, dynamic_prompt = get_invoice_extraction_prompt_parts(
         email_context=email_context,
         supplier_instructions=supplier_instructions,
         trial=trial_version,
@@ -61,8 +75,7 @@ def extract_invoice_data(
     try:
         if is_excel_file(mime_type):
             try:
-                df = read_excel_safe(file_path)
-                csv_text = df.to_csv(index=False)
+                csv_text = read_excel_as_csv(file_path)
                 file_parts.append(types.Part.from_text(text=csv_text))
                 logger.info("Excel file converted to CSV for Phase 2.")
             except Exception as e:
@@ -70,8 +83,7 @@ def extract_invoice_data(
                 return [], 0.0, {}, {}
         elif "pdf" in mime_type.lower():
             logger.info("Preparing hybrid PDF + Image inputs for Phase 2...")
-            with open(file_path, "rb") as f:
-                file_content = f.read()
+            file_content = read_file_bytes(file_path)
 
             file_parts.append(types.Part.from_bytes(data=file_content, mime_type="application/pdf"))
 
@@ -84,14 +96,12 @@ def extract_invoice_data(
                 logger.warning("PDF to image conversion returned empty. Proceeding with natively attached PDF only.")
 
         elif "image" in mime_type.lower():
-            with open(file_path, "rb") as f:
-                file_content = f.read()
+            file_content = read_file_bytes(file_path)
             file_parts.append(types.Part.from_bytes(data=file_content, mime_type=mime_type))
 
         else:
             logger.warning(f"Warning: Sending unknown mime-type {mime_type} as PDF fallback.")
-            with open(file_path, "rb") as f:
-                file_content = f.read()
+            file_content = read_file_bytes(file_path)
             file_parts.append(types.Part.from_bytes(data=file_content, mime_type="application/pdf"))
 
     except FileNotFoundError:
@@ -103,10 +113,14 @@ def extract_invoice_data(
         current_schema = None
     else:
         current_tools = None
-        current_schema = raw_response_schema
+        current_schema = RAW_RESPONSE_SCHEMA
 
     try:
-        parts_list = file_parts + [types.Part.from_text(text=prompt_text)]
+        # Static instructions go first so the identical prefix can hit Gemini's implicit cache;
+        # the per-invoice file and the email/supplier context follow it
+        parts_list = [types.Part.from_text(text=static_prompt), *file_parts]
+        if dynamic_prompt:
+            parts_list.append(types.Part.from_text(text=dynamic_prompt))
 
         response = generate_content_safe(
             model=model_name,
@@ -125,16 +139,10 @@ def extract_invoice_data(
         else:
             raw_json = ""
 
-        if retry_count > 0:
-            if "```json" in raw_json:
-                try:
-                    raw_json = raw_json.split("```json")[1].split("```")[0].strip()
-                except IndexError:
-                    pass
-            else:
-                raw_json = raw_json.replace("```json", "").replace("```", "").strip()
-
-        raw_json = raw_json.replace("```json", "").replace("```", "").strip()
+        # Trial 1 is schema-constrained and returns bare JSON. Trial 2 (code execution) answers in
+        # free text with the JSON inside a markdown block.
+        if current_schema is None:
+            raw_json = _strip_json_fence(raw_json)
 
         logger.info(f"{trace_context}✅ Phase 2 Finished (Model={model_name}). JSON received.")
         logger.debug(
@@ -142,8 +150,10 @@ def extract_invoice_data(
         )
 
         parsed_json = {}
+        json_parsed = False
         try:
             parsed_json = json.loads(raw_json)
+            json_parsed = True
             logger.info(
                 "AI Model Response (Phase 2 - Structured)",
                 extra={
@@ -175,13 +185,24 @@ def extract_invoice_data(
             response_metadata = extract_response_metadata(response)
             usage_metadata = response_metadata.get("usage", {})
             cost = calculate_cost(model_name, usage_metadata)
+            prompt_tokens = usage_metadata.get("prompt_token_count") or 0
+            if prompt_tokens:
+                cached_tokens = usage_metadata.get("cached_content_token_count") or 0
+                logger.info(
+                    f"{trace_context}Phase 2 prompt cache: {cached_tokens}/{prompt_tokens} tokens "
+                    f"({cached_tokens / prompt_tokens:.0%})"
+                )
         except Exception as cost_err:
             logger.warning(f"{trace_context}Failed to calculate cost for Phase 2: {cost_err}")
 
         logger.info(f"{trace_context}Phase 2 Cost: ${cost:.6f}")
 
         try:
-            multi_order = MultiOrderResponse.model_validate_json(raw_json)
+            # Validate the dict parsed above instead of parsing the JSON text a second time
+            if json_parsed:
+                multi_order = MultiOrderResponse.model_validate(parsed_json)
+            else:
+                multi_order = MultiOrderResponse.model_validate_json(raw_json)
             return multi_order.orders, cost, response_metadata, parsed_json
         except Exception as validation_err:
             logger.error(
@@ -15,7 +15,6 @@ from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
 from src.core.exceptions import ExtractionError, SupplierMatchError, ValidationError
-from src.core.processor import OrderProcessor
 from src.data.items_service import ItemsService
 from src.data.supplier_service import UNKNOWN_SUPPLIER, SupplierService
 from src.export.excel_generator import generate_excel_from_order
@@ -1,8 +1,6 @@
 from datetime import datetime, timedelta
 from typing import Optional
 
-import yfinance as yf
-
 from src.shared.logger import get_logger
 
 logger = get_logger(__name__)
@@ -96,6 +94,9 @@ def get_usd_to_ils_rate() -> float:
         return _cached_rate
 
     try:
+        # yfinance pulls in pandas; imported here so modules that only need calculate_cost stay light
+        import yfinance as yf
+
         # Fetch data for "ILS=X" (USD to ILS)
         ticker = yf.Ticker("ILS=X")
         # Get the latest close price
@@ -29,10 +29,14 @@ class Settings(BaseSettings):
     FIRESTORE_SESSIONS_COLLECTION: str = "sessions"
     FIRESTORE_PROCESSING_COLLECTION: str = "processing_events"
     FIRESTORE_EMAIL_OUTBOX_COLLECTION: str = "email_outbox"
+    FIRESTORE_EXTRACTION_CACHE_COLLECTION: str = "extraction_cache"
     SESSION_EXPIRY_HOURS: int = 24
 
     # --- AI / Gemini ---
     GEMINI_API_KEY: SecretStr | None = Field(validation_alias="GEMINI_API_KEY", default=None)
+    # Local development only: directory where Gemini responses are recorded and replayed
+    # (ignored in the cloud runtime, where every extraction must hit the model)
+    GEMINI_RESPONSE_CACHE_DIR: str = Field(validation_alias="GEMINI_RESPONSE_CACHE_DIR", default="")
 
     # --- Gmail Integration ---
     GMAIL_TOKEN: SecretStr | None = Field(validation_alias="GMAIL_TOKEN", default=None)
@@ -22,6 +22,15 @@ EXCEL_MIME_TYPES = {
 }
 
 
+def read_file_bytes(file_path: str) -> bytes:
+    """
+    Returns a file's content. Nothing is cached: invoices can be large, so callers that need the
+    bytes more than once read them once and pass them along.
+    """
+    with open(file_path, "rb") as f:
+        return f.read()
+
+
 def get_mime_type(file_path: str) -> str:
     """
     Detects the MIME type of a file based on its extension.
@@ -35,3 +35,33 @@ def mock_init_client(mocker):
     Mock vertex_client.init_client to prevent real connection attempts during import.
     """
     return mocker.patch("src.extraction.vertex_client.init_client")
+
+
+@pytest.fixture
+def stale_dimension_xlsx(tmp_path):
+    """
+    Builds an .xlsx whose `<dimension>` tag claims a single cell ("A1"), as some exporters write.
+    openpyxl's read-only reader trusts that tag unless the dimensions are reset.
+    """
+    import re
+    import zipfile
+
+    from openpyxl import Workbook
+
+    def build(rows: list[list], name: str = "stale.xlsx") -> str:
+        wb = Workbook()
+        for row in rows:
+            wb.active.append(row)
+        source = tmp_path / f"source_{name}"
+        wb.save(source)
+
+        path = tmp_path / name
+        with zipfile.ZipFile(source) as src, zipfile.ZipFile(path, "w") as dst:
+            for item in src.infolist():
+                data = src.read(item.filename)
+                if item.filename == "xl/worksheets/sheet1.xml":
+                    data = re.sub(rb'<dimension ref="[^"]*"/>', b'<dimension ref="A1"/>', data)
+                dst.writestr(item, data)
+        return str(path)
+
+    return build
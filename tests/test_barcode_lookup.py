@@ -73,6 +73,52 @@ class TestBarcodeLookup(unittest.TestCase):
         self.assertNotIn("00123", result)
         self.assertEqual(len(result), 1)
 
+    def test_get_items_batch_uses_single_get_all(self):
+        found = MagicMock(exists=True, id="7290001")
+        found.to_dict.return_value = {"item_code": "A1", "name": "Soap"}
+        missing = MagicMock(exists=False, id="07290002")
+        self.mock_db.get_all.return_value = iter([found, missing])
+
+        result = self.service.get_items_batch(["07290001", "07290002", "07290001"])
+
+        self.mock_db.get_all.assert_called_once()
+        requested_ids = {call.args[0] for call in self.mock_collection.document.call_args_list}
+        self.assertEqual(requested_ids, {"07290001", "7290001", "07290002", "7290002"})
+        self.assertEqual(result, [{"item_code": "A1", "name": "Soap", "barcode": "7290001"}])
+
+    def test_get_items_by_barcodes_resolves_leading_zeros(self):
+        exact = MagicMock(exists=True, id="0555")
+        exact.to_dict.return_value = {"item_code": "EXACT"}
+        stripped = MagicMock(exists=True, id="7290001")
+        stripped.to_dict.return_value = {"item_code": "A1"}
+        self.mock_db.get_all.return_value = iter([exact, stripped])
+
+        result = self.service.get_items_by_barcodes([" 07290001 ", "0555", "999", None])
+
+        self.mock_db.get_all.assert_called_once()
+        self.assertEqual(set(result), {"07290001", "0555"})
+        self.assertEqual(result["07290001"]["item_code"], "A1")
+        self.assertEqual(result["0555"]["item_code"], "EXACT")
+
+    def test_search_items_falls_back_to_name_prefix_without_duplicates(self):
+        self.mock_collection.document.return_value.get.return_value.exists = False
+        milk = MagicMock(id="7290001")
+        milk.to_dict.return_value = {"name": "Milk 3%"}
+        milk_again = MagicMock(id="7290001")
+        milk_again.to_dict.return_value = {"name": "Milk 3%"}
+        mild = MagicMock(id="7290002")
+        mild.to_dict.return_value = {"name": "Mild cheese"}
+        self.mock_collection.where.return_value.where.return_value.limit.return_value.stream.return_value = [
+            milk,
+            milk_again,
+            mild,
+        ]
+
+        results = self.service.search_items(" Mil ")
+
+        self.assertEqual([r["barcode"] for r in results], ["7290001", "7290002"])
+        self.assertEqual(results[0]["name"], "Milk 3%")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,9 @@
+import os
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 
+from src.core import processor as processor_module
 from src.core.processor import OrderProcessor
 
 # Using string enum for VatStatus in models.py: VatStatus.EXCLUDED
@@ -10,6 +13,14 @@ from src.shared.models import ExtractedOrder, LineItem, VatStatus
 class TestOrderProcessor(unittest.TestCase):
     def setUp(self):
         self.processor = OrderProcessor()
+        processor_module._extraction_cache.clear()
+
+    def _write_invoice(self, content: bytes = b"%PDF-1.4 invoice") -> str:
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
 
     @patch("src.core.processor.vertex_client")
     def test_process_file_basic_flow(self, mock_vertex):
@@ -86,6 +97,201 @@ class TestOrderProcessor(unittest.TestCase):
         self.assertGreater(len(orders[0].warnings), 0)
         self.assertTrue(any("total" in w.lower() for w in orders[0].warnings))
 
+    @patch("src.core.processor.vertex_client")
+    def test_closer_first_attempt_is_kept_when_both_trials_fail(self, mock_vertex):
+        trial_1 = ExtractedOrder(
+            invoice_number="TRIAL_1",
+            line_items=[LineItem(description="A", quantity=10, raw_unit_price=10.0)],
+            document_total_with_vat=100.0,  # off by the VAT amount
+        )
+        trial_2 = ExtractedOrder(
+            invoice_number="TRIAL_2",
+            line_items=[LineItem(description="A", quantity=1, final_net_price=100.0)],
+            document_total_with_vat=50.0,
+            is_math_valid=False,
+        )
+        mock_vertex.extract_invoice_data.side_effect = [([trial_1], 0.01, {}, {}), ([trial_2], 0.02, {}, {})]
+
+        orders, cost, _, _ = self.processor.process_file("dummy.pdf")
+
+        self.assertEqual(orders[0].invoice_number, "TRIAL_1")
+        self.assertAlmostEqual(cost, 0.03)
+        self.assertIn(processor_module.BOTH_ATTEMPTS_FAILED_WARNING, orders[0].warnings)
+
+    @patch("src.core.processor.vertex_client")
+    def test_first_attempt_is_returned_when_retry_errors(self, mock_vertex):
+        trial_1 = ExtractedOrder(
+            invoice_number="TRIAL_1",
+            line_items=[LineItem(description="A", quantity=1, final_net_price=100.0)],
+            document_total_with_vat=50.0,
+        )
+        mock_vertex.extract_invoice_data.side_effect = [([trial_1], 0.01, {}, {}), RuntimeError("quota")]
+
+        orders, _, _, _ = self.processor.process_file("dummy.pdf")
+
+        self.assertEqual([order.invoice_number for order in orders], ["TRIAL_1"])
+        self.assertEqual(mock_vertex.extract_invoice_data.call_count, 2)
+        self.assertIn(processor_module.RETRY_FAILED_WARNING, orders[0].warnings)
+        self.assertNotIn(processor_module.BOTH_ATTEMPTS_FAILED_WARNING, orders[0].warnings)
+
+    @patch("src.core.processor.vertex_client")
+    def test_attempts_with_different_order_counts_are_not_compared(self, mock_vertex):
+        trial_1 = ExtractedOrder(
+            invoice_number="TRIAL_1",
+            line_items=[LineItem(description="A", quantity=10, raw_unit_price=10.0)],
+            document_total_with_vat=100.0,  # off by the VAT amount
+        )
+        trial_2_orders = [
+            ExtractedOrder(
+                invoice_number=f"TRIAL_2_{i}",
+                line_items=[LineItem(description="A", quantity=1, final_net_price=100.0)],
+                document_total_with_vat=50.0,
+                is_math_valid=False,
+            )
+            for i in range(2)
+        ]
+        mock_vertex.extract_invoice_data.side_effect = [([trial_1], 0.01, {}, {}), (trial_2_orders, 0.02, {}, {})]
+
+        orders, _, _, _ = self.processor.process_file("dummy.pdf")
+
+        self.assertEqual([order.invoice_number for order in orders], ["TRIAL_2_0", "TRIAL_2_1"])
+
+    @patch("src.core.processor.vertex_client")
+    def test_structurally_broken_first_attempt_is_not_returned_when_retry_errors(self, mock_vertex):
+        trial_1 = ExtractedOrder(
+            invoice_number="TRIAL_1",
+            line_items=[LineItem(description="A", quantity=2.5, final_net_price=40.0)],
+            document_total_with_vat=100.0,
+        )
+        mock_vertex.extract_invoice_data.side_effect = [([trial_1], 0.01, {}, {}), RuntimeError("quota")]
+
+        orders, _, _, _ = self.processor.process_file("dummy.pdf")
+
+        self.assertEqual(orders, [])
+
+    @patch("src.core.processor.vertex_client")
+    def test_validated_extraction_is_reused_for_identical_file(self, mock_vertex):
+        mock_order = ExtractedOrder(
+            invoice_number="INV123",
+            line_items=[
+                LineItem(description="Item 1", quantity=10, raw_unit_price=10.0, vat_status=VatStatus.EXCLUDED)
+            ],
+            document_total_with_vat=117.0,
+            vat_rate=17.0,
+        )
+        mock_vertex.extract_invoice_data.return_value = ([mock_order], 0.01, {}, {})
+        path = self._write_invoice()
+
+        first, first_cost, _, _ = self.processor.process_file(path, supplier_instructions="net")
+        first[0].supplier_code = "MUTATED"
+        second, second_cost, _, _ = self.processor.process_file(path, supplier_instructions="net")
+
+        mock_vertex.extract_invoice_data.assert_called_once()
+        self.assertEqual((first_cost, second_cost), (0.01, 0.0))
+        self.assertEqual(second[0].invoice_number, "INV123")
+        self.assertNotEqual(second[0].supplier_code, "MUTATED")
+
+        # Different instructions or file content is a cache miss
+        self.processor.process_file(path, supplier_instructions="gross")
+        self.processor.process_file(self._write_invoice(b"%PDF-1.4 other"), supplier_instructions="net")
+        self.assertEqual(mock_vertex.extract_invoice_data.call_count, 3)
+
+    @patch("src.core.processor.vertex_client")
+    def test_failed_validation_is_not_cached(self, mock_vertex):
+        mock_order = ExtractedOrder(
+            line_items=[LineItem(description="A", quantity=1, final_net_price=100.0, vat_status=VatStatus.EXCLUDED)],
+            document_total_with_vat=50.0,
+            vat_rate=17.0,
+        )
+        mock_vertex.extract_invoice_data.side_effect = lambda **_: ([mock_order.model_copy(deep=True)], 0.01, {}, {})
+        path = self._write_invoice()
+
+        self.processor.process_file(path)
+        calls_first_run = mock_vertex.extract_invoice_data.call_count
+        self.processor.process_file(path)
+
+        self.assertEqual(mock_vertex.extract_invoice_data.call_count, 2 * calls_first_run)
+
+    @patch("src.core.processor.vertex_client")
+    def test_warned_retry_result_is_not_cached(self, mock_vertex):
+        trial_1 = ExtractedOrder(
+            line_items=[LineItem(description="A", quantity=1, final_net_price=100.0, vat_status=VatStatus.EXCLUDED)],
+            document_total_with_vat=50.0,
+            vat_rate=17.0,
+        )
+        # Trial 2 matches the total but misses the document quantity, which only warns
+        trial_2 = ExtractedOrder(
+            line_items=[LineItem(description="A", quantity=1, final_net_price=100.0, vat_status=VatStatus.EXCLUDED)],
+            document_total_with_vat=117.0,
+            vat_rate=17.0,
+            document_total_quantity=3,
+        )
+        mock_vertex.extract_invoice_data.side_effect = lambda retry_count, **_: (
+            [(trial_1 if retry_count == 0 else trial_2).model_copy(deep=True)],
+            0.01,
+            {},
+            {},
+        )
+        path = self._write_invoice()
+
+        orders, _, _, _ = self.processor.process_file(path)
+        self.processor.process_file(path)
+
+        self.assertTrue(orders[0].warnings)
+        self.assertEqual(mock_vertex.extract_invoice_data.call_count, 4)
+
+    @patch("src.core.processor.vertex_client")
+    def test_persistent_cache_hit_skips_extraction(self, mock_vertex):
+        cached_order = ExtractedOrder(invoice_number="FROM_CACHE", line_items=[])
+        extraction_cache = MagicMock()
+        extraction_cache.get.return_value = ([cached_order], {1: {}}, {})
+        processor = OrderProcessor(extraction_cache=extraction_cache)
+        path = self._write_invoice()
+
+        orders, cost, _, _ = processor.process_file(path)
+        processor.process_file(path)
+
+        mock_vertex.extract_invoice_data.assert_not_called()
+        extraction_cache.get.assert_called_once()  # second call served by the process cache
+        self.assertEqual((orders[0].invoice_number, cost), ("FROM_CACHE", 0.0))
+
+    @patch("src.core.processor.vertex_client")
+    def test_validated_extraction_is_written_to_persistent_cache(self, mock_vertex):
+        mock_order = ExtractedOrder(
+            line_items=[
+                LineItem(description="Item 1", quantity=10, raw_unit_price=10.0, vat_status=VatStatus.EXCLUDED)
+            ],
+            document_total_with_vat=117.0,
+            vat_rate=17.0,
+        )
+        mock_vertex.extract_invoice_data.return_value = ([mock_order], 0.01, {}, {})
+        extraction_cache = MagicMock()
+        extraction_cache.get.return_value = None
+
+        OrderProcessor(extraction_cache=extraction_cache).process_file(self._write_invoice())
+
+        key, orders, _, _ = extraction_cache.put.call_args.args
+        self.assertEqual(key, extraction_cache.get.call_args.args[0])
+        self.assertEqual(len(orders), 1)
+
+    @patch("src.core.processor.vertex_client")
+    def test_warned_result_is_not_written_to_persistent_cache(self, mock_vertex):
+        mock_order = ExtractedOrder(
+            line_items=[LineItem(description="A", quantity=1, final_net_price=100.0, vat_status=VatStatus.EXCLUDED)],
+            document_total_with_vat=50.0,
+            vat_rate=17.0,
+        )
+        mock_vertex.extract_invoice_data.side_effect = lambda **_: ([mock_order.model_copy(deep=True)], 0.01, {}, {})
+        extraction_cache = MagicMock()
+        extraction_cache.get.return_value = None
+
+        processor = OrderProcessor(extraction_cache=extraction_cache)
+        orders, _, _, _ = processor.process_file(self._write_invoice())
+        processor._store_cached("key", (orders, {}, {}))
+
+        self.assertTrue(orders[0].warnings)
+        extraction_cache.put.assert_not_called()
+
 
 if __name__ == "__main__":
     unittest.main()
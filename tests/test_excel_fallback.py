@@ -0,0 +1,137 @@
+import zipfile
+from datetime import datetime
+from unittest.mock import patch
+
+import pandas as pd
+from openpyxl import Workbook
+
+from src.extraction.vertex import excel_fallback
+from src.extraction.vertex.excel_fallback import read_excel_as_csv
+
+
+def test_read_excel_as_csv_streams_rows(tmp_path):
+    path = tmp_path / "invoice.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["ברקוד", "כמות", "מחיר", "תאריך"])
+    ws.append([7290001234567, 12, 29.9, datetime(2026, 1, 1)])
+    ws.append([None, None, None, None])
+    ws.append(["A-17", None, 1.5, datetime(2026, 1, 1, 8, 30)])
+    wb.save(path)
+
+    with patch.object(pd, "read_excel") as read_excel:
+        csv_text = read_excel_as_csv(str(path))
+
+    read_excel.assert_not_called()
+    assert csv_text == ("ברקוד,כמות,מחיר,תאריך\n7290001234567,12,29.9,2026-01-01\nA-17,,1.5,2026-01-01 08:30:00\n")
+
+
+def test_read_excel_as_csv_ignores_stale_dimension_tag(stale_dimension_xlsx):
+    path = stale_dimension_xlsx([["barcode", "qty", None], [7290001, 2], [7290002, 3, "note"]])
+
+    assert read_excel_as_csv(path) == "barcode,qty,\n7290001,2,\n7290002,3,note\n"
+
+
+def test_read_excel_as_csv_falls_back_for_unreadable_workbooks(tmp_path):
+    path = tmp_path / "legacy.xls"
+    path.write_bytes(b"not a zip")
+
+    with patch.object(pd, "read_excel", return_value=pd.DataFrame({"a": [1]})) as read_excel:
+        assert read_excel_as_csv(str(path)) == "a\n1\n"
+
+    read_excel.assert_called_once_with(str(path))
+
+
+def test_read_excel_safe_reads_with_openpyxl_first(tmp_path):
+    path = tmp_path / "invoice.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["ברקוד", None])
+    ws.append(["7290001", 3])
+    wb.save(path)
+
+    with patch.object(pd, "read_excel") as read_excel:
+        df = excel_fallback.read_excel_safe(str(path))
+
+    read_excel.assert_not_called()
+    assert list(df.columns) == ["ברקוד", "Unnamed: 1"]
+    assert df.values.tolist() == [["7290001", 3]]
+
+
+def test_read_excel_safe_ignores_stale_dimension_tag(stale_dimension_xlsx):
+    path = stale_dimension_xlsx([["barcode", "qty"], [7290001, 2], [7290002, 3]])
+
+    df = excel_fallback.read_excel_safe(path)
+
+    assert df.to_dict("list") == {"barcode": [7290001, 7290002], "qty": [2, 3]}
+
+
+def test_read_xlsx_via_xml_places_sparse_cells_by_reference(tmp_path):
+    path = tmp_path / "sparse.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["ברקוד", "תיאור", "כמות"])
+    ws.append([7290001234567, None, 12])
+    ws.append(["A-17", "סבון", 1.5, True])
+    wb.save(path)
+
+    df = excel_fallback.read_xlsx_via_xml(str(path))
+
+    assert list(df.columns) == ["ברקוד", "תיאור", "כמות", "Unnamed: 3"]
+    assert df.to_csv(index=False).splitlines()[1:] == ["7290001234567,,12.0,", "A-17,סבון,1.5,True"]
+
+
+def test_read_xlsx_via_xml_handles_understated_dimension(tmp_path):
+    path = tmp_path / "raw.xlsx"
+    sheet = (
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<dimension ref="A1"/><sheetData>'
+        '<row r="1"><c r="A1" t="inlineStr"><is><t>code</t></is></c>'
+        '<c r="C1" t="inlineStr"><is><t>qty</t></is></c></row>'
+        '<row r="2"><c><v>7</v></c><c><v>2.5</v></c><c><v>3</v></c></row>'
+        "</sheetData></worksheet>"
+    )
+    with zipfile.ZipFile(path, "w") as z:
+        z.writestr("xl/worksheets/sheet1.xml", sheet)
+
+    df = excel_fallback.read_xlsx_via_xml(str(path))
+
+    assert list(df.columns) == ["code", "Unnamed: 1", "qty"]
+    assert df.iloc[0].tolist() == [7, 2.5, 3]
+
+
+def test_read_xlsx_via_xml_resolves_shared_strings(tmp_path):
+    path = tmp_path / "shared.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["תיאור", "כמות"])
+    ws.append(["סבון", 2])
+    ws.append(["סבון", 3])
+    wb.save(path)
+
+    df = excel_fallback.read_xlsx_via_xml(str(path))
+
+    assert list(df.columns) == ["תיאור", "כמות"]
+    assert df["תיאור"].tolist() == ["סבון", "סבון"]
+
+
+def test_read_excel_as_csv_reuses_conversion_until_file_changes(tmp_path):
+    path = tmp_path / "invoice.xlsx"
+    wb = Workbook()
+    wb.active.append(["a", 1])
+    wb.save(path)
+
+    with patch.object(excel_fallback.openpyxl, "load_workbook", wraps=excel_fallback.openpyxl.load_workbook) as load:
+        assert read_excel_as_csv(str(path)) == read_excel_as_csv(str(path)) == "a,1\n"
+        assert load.call_count == 1
+
+        wb.active.append(["b", 2])
+        wb.save(path)
+        assert read_excel_as_csv(str(path)) == "a,1\nb,2\n"
+        assert load.call_count == 2
+
+
+def test_column_index_decodes_cell_references():
+    assert [excel_fallback._column_index(ref) for ref in ("A1", "z9", "AA10", "AB12", "XFD1")] == [0, 25, 26, 27, 16383]
+    assert excel_fallback._column_index("") is None
+    assert excel_fallback._column_index("12") is None
@@ -0,0 +1,89 @@
+import io
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from src.export.excel_generator import _clean_str, generate_excel_from_order
+from src.export.new_items_generator import filter_new_items_from_order, generate_new_items_excel
+from src.shared.models import ExtractedOrder, LineItem
+
+
+def test_clean_str_normalizes_numbers_and_placeholders():
+    assert _clean_str(None) == ""
+    assert _clean_str(7290001234567.0) == "7290001234567"
+    assert _clean_str(12) == "12"
+    assert _clean_str(2.5) == "2.5"
+    assert _clean_str(float("nan")) == ""
+    assert _clean_str(" NaN ") == ""
+    assert _clean_str("None") == ""
+    assert _clean_str(" 1234.0 ") == "1234"
+    assert _clean_str("A-17") == "A-17"
+
+
+@patch("src.export.excel_generator.get_items_service")
+def test_generate_excel_maps_barcodes_to_item_codes(mock_get_items_service):
+    items_service = MagicMock()
+    items_service.get_items_by_barcodes.return_value = {"7290001": {"barcode": "7290001", "item_code": "555"}}
+    mock_get_items_service.return_value = items_service
+
+    order = ExtractedOrder(
+        line_items=[
+            LineItem(barcode="7290001", description="Known", quantity=3, final_net_price=4.5),
+            LineItem(barcode="7290002", description="Unknown", quantity=1, final_net_price=10.0),
+            LineItem(description="No barcode", quantity=2, final_net_price=1.0),
+        ]
+    )
+
+    buffer = io.BytesIO()
+    generate_excel_from_order(order, buffer)
+    buffer.seek(0)
+    df = pd.read_excel(buffer, dtype={"קוד פריט": str})
+
+    assert list(df.columns) == ["קוד פריט", "כמות", "מחיר נטו"]
+    assert df["קוד פריט"].fillna("").tolist() == ["555", "7290002", ""]
+    assert df["כמות"].tolist() == [3, 1, 2]
+    assert df["מחיר נטו"].tolist() == [4.5, 10.0, 1.0]
+
+
+@patch("src.export.excel_generator.get_items_service")
+def test_generate_excel_writes_headers_for_empty_order(mock_get_items_service):
+    buffer = io.BytesIO()
+    generate_excel_from_order(ExtractedOrder(line_items=[]), buffer)
+    buffer.seek(0)
+    df = pd.read_excel(buffer)
+
+    assert df.empty
+    assert list(df.columns) == ["קוד פריט", "כמות", "מחיר נטו"]
+    mock_get_items_service.assert_not_called()
+
+
+def test_generate_new_items_excel_dedupes_barcodes(tmp_path):
+    output = tmp_path / "new_items.xlsx"
+    items = [
+        LineItem(barcode="7290001", description="Soap", quantity=1, final_net_price=10.0),
+        LineItem(barcode="7290001", description="Soap again", quantity=2, final_net_price=10.0),
+        LineItem(barcode="7290002", description="Free", quantity=1, final_net_price=0),
+    ]
+
+    generate_new_items_excel(items, "100", str(output))
+    df = pd.read_excel(output, sheet_name="Sheet1", dtype={"ברקוד": str, "ברקוד 2": str, "מספר ספק": str})
+
+    assert list(df.columns) == ["ברקוד", "שם פריט", "ברקוד 2", "מכירה", "עלות נטו", "מספר ספק"]
+    assert df["ברקוד"].tolist() == ["7290001", "7290002"]
+    assert df["ברקוד 2"].tolist() == ["7290001", "7290002"]
+    assert df["מכירה"].tolist()[1] == 0
+    assert df["מספר ספק"].tolist() == ["100", "100"]
+
+
+def test_filter_new_items_from_order_keeps_only_new_barcodes():
+    order = ExtractedOrder(
+        line_items=[
+            LineItem(barcode=" 7290001 ", description="New", quantity=1, final_net_price=1.0),
+            LineItem(barcode="7290002", description="Known", quantity=1, final_net_price=1.0),
+            LineItem(description="No barcode", quantity=1, final_net_price=1.0),
+        ]
+    )
+
+    new_items = filter_new_items_from_order(order, ["7290001 "])
+
+    assert [item.description for item in new_items] == ["New"]
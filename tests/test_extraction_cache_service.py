@@ -0,0 +1,43 @@
+from unittest.mock import MagicMock
+
+from src.data.extraction_cache_service import ExtractionCacheService
+from src.shared.models import ExtractedOrder, LineItem
+
+
+def _doc_snapshot(*, exists: bool, data: dict | None = None):
+    snapshot = MagicMock()
+    snapshot.exists = exists
+    snapshot.to_dict.return_value = data or {}
+    return snapshot
+
+
+def test_put_then_get_round_trips_orders_and_raw_responses():
+    db = MagicMock()
+    doc_ref = db.collection.return_value.document.return_value
+    service = ExtractionCacheService(firestore_client=db)
+    order = ExtractedOrder(
+        invoice_number="INV1",
+        line_items=[LineItem(barcode="7290001", description="סבון", quantity=2, final_net_price=3.5)],
+    )
+
+    service.put("abc", [order], {1: {"orders": []}}, {"usage": {"prompt_token_count": 10}})
+    stored = doc_ref.set.call_args.args[0]
+    doc_ref.get.return_value = _doc_snapshot(exists=True, data=stored)
+    orders, raw_responses, metadata = service.get("abc")
+
+    db.collection.return_value.document.assert_called_with("abc")
+    assert orders == [order]
+    assert raw_responses == {1: {"orders": []}}
+    assert metadata == {"usage": {"prompt_token_count": 10}}
+
+
+def test_get_treats_missing_and_unreadable_entries_as_miss():
+    db = MagicMock()
+    doc_ref = db.collection.return_value.document.return_value
+    service = ExtractionCacheService(firestore_client=db)
+
+    doc_ref.get.return_value = _doc_snapshot(exists=False)
+    assert service.get("abc") is None
+
+    doc_ref.get.return_value = _doc_snapshot(exists=True, data={"payload": "not json"})
+    assert service.get("abc") is None
@@ -0,0 +1,132 @@
+from unittest.mock import MagicMock, patch
+
+from src.extraction.local_detector import REGEX_EMAIL, REGEX_ISRAELI_ID, LocalSupplierDetector
+
+
+def test_email_regex_extracts_addresses_and_rejects_pipe_tld():
+    text = "Contact: Orders@Acme.co.il, sales@acme.com; bad@host.c|m"
+
+    assert REGEX_EMAIL.findall(text) == ["Orders@Acme.co.il", "sales@acme.com"]
+    assert REGEX_EMAIL.search("Acme <orders@acme.co.il>").group(0) == "orders@acme.co.il"
+
+
+def test_israeli_id_regex_requires_exactly_nine_digits():
+    text = "ח.פ 512345678 | tel 0501234567 | 123456789"
+
+    assert [m.group(1) for m in REGEX_ISRAELI_ID.finditer(text)] == ["512345678", "123456789"]
+
+
+@patch("src.extraction.local_detector.SupplierService", MagicMock())
+@patch("src.extraction.local_detector.settings")
+def test_is_blacklisted_email_checks_exact_and_domain_entries(mock_settings):
+    mock_settings.blacklist_ids = set()
+    mock_settings.blacklist_emails = {"orders@store.co.il", "@internal.co.il"}
+    detector = LocalSupplierDetector()
+
+    assert detector._is_blacklisted_email("orders@store.co.il")
+    assert detector._is_blacklisted_email("anyone@internal.co.il")
+    assert not detector._is_blacklisted_email("other@store.co.il")
+    assert not detector._is_blacklisted_email("someone@notinternal.co.il")
+    assert not detector._is_blacklisted_email("internal.co.il")
+
+
+def test_extract_text_pdf_reads_first_page_only(tmp_path):
+    import fitz  # PyMuPDF
+
+    pdf_path = tmp_path / "order.pdf"
+    with fitz.open() as doc:
+        doc.new_page().insert_text((72, 72), "Supplier 512345678 orders@acme.co.il")
+        doc.new_page().insert_text((72, 72), "Second page 999999999")
+        doc.save(pdf_path)
+
+    text = LocalSupplierDetector._extract_text_pdf(MagicMock(), str(pdf_path))
+
+    assert "512345678" in text
+    assert "orders@acme.co.il" in text
+    assert "999999999" not in text
+
+
+def test_extract_text_pdf_returns_empty_for_unreadable_file(tmp_path):
+    bad_path = tmp_path / "broken.pdf"
+    bad_path.write_bytes(b"not a pdf")
+
+    assert LocalSupplierDetector._extract_text_pdf(MagicMock(), str(bad_path)) == ""
+
+
+def test_extract_text_excel_scans_first_rows_of_xlsx_and_csv(tmp_path):
+    from openpyxl import Workbook
+
+    xlsx_path = tmp_path / "order.xlsx"
+    wb = Workbook()
+    wb.active.append(["ספק", 512345678, None, "orders@acme.co.il"])
+    for i in range(30):
+        wb.active.append([f"row {i}"])
+    wb.save(xlsx_path)
+    csv_path = tmp_path / "order.csv"
+    csv_path.write_text("a,b\n" * 20 + "123456789,late\n", encoding="utf-8")
+
+    xlsx_text = LocalSupplierDetector._extract_text_excel(
+        LocalSupplierDetector, str(xlsx_path), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    csv_text = LocalSupplierDetector._extract_text_excel(LocalSupplierDetector, str(csv_path), "text/csv")
+
+    assert xlsx_text.splitlines()[0] == "ספק 512345678  orders@acme.co.il"
+    assert "row 18" in xlsx_text and "row 19" not in xlsx_text
+    assert csv_text.count("\n") == 20 and "123456789" not in csv_text
+
+
+def test_extract_text_xlsx_ignores_stale_dimension_tag(stale_dimension_xlsx):
+    path = stale_dimension_xlsx([["ספק", 512345678], ["email", "orders@acme.co.il"]])
+
+    text = LocalSupplierDetector._extract_text_xlsx(path)
+
+    assert text.splitlines() == ["ספק 512345678", "email orders@acme.co.il"]
+
+
+@patch("src.extraction.local_detector.SupplierService")
+@patch("src.extraction.local_detector.settings")
+def test_match_identifiers_returns_on_first_known_id(mock_settings, mock_supplier_service):
+    mock_settings.blacklist_ids = {"111111111"}
+    mock_settings.blacklist_emails = set()
+    mock_supplier_service.return_value.match_supplier.side_effect = lambda **kw: (
+        "100" if kw.get("global_id") == "512345678" else "UNKNOWN"
+    )
+    detector = LocalSupplierDetector()
+
+    code, conf, found = detector._match_identifiers("111111111 999999999 512345678 orders@acme.co.il")
+
+    assert (code, conf) == ("100", 1.0)
+    assert found == ["111111111", "999999999", "512345678"]
+    assert all("email" not in c.kwargs for c in mock_supplier_service.return_value.match_supplier.call_args_list)
+
+    assert detector._match_identifiers("no identifiers here") == (None, 0.0, [])
+
+
+@patch("src.extraction.local_detector.SupplierService")
+@patch("src.extraction.local_detector.settings")
+def test_detector_reuses_injected_supplier_service(mock_settings, mock_supplier_service):
+    mock_settings.blacklist_ids = set()
+    mock_settings.blacklist_emails = set()
+    shared = MagicMock()
+
+    detector = LocalSupplierDetector(shared)
+
+    assert detector.supplier_service is shared
+    shared._ensure_cache_loaded.assert_called_once()
+    mock_supplier_service.assert_not_called()
+
+
+@patch("src.extraction.local_detector.SupplierService")
+@patch("src.extraction.local_detector.settings")
+def test_match_identifiers_looks_up_each_email_once(mock_settings, mock_supplier_service):
+    mock_settings.blacklist_ids = set()
+    mock_settings.blacklist_emails = set()
+    match_supplier = mock_supplier_service.return_value.match_supplier
+    match_supplier.return_value = "UNKNOWN"
+    detector = LocalSupplierDetector()
+
+    code, _, found = detector._match_identifiers("Info@Acme.co.il header\nfooter info@acme.co.il x@y.com")
+
+    assert code is None
+    assert sorted(found) == ["info@acme.co.il", "x@y.com"]
+    assert match_supplier.call_count == 2
@@ -0,0 +1,72 @@
+import os
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from src.extraction.vertex import excel_fallback, phase1_supplier
+from src.extraction.vertex.phase1_supplier import filter_email_context, load_suppliers_csv
+
+
+@pytest.fixture
+def excluded_emails():
+    """Sets settings.excluded_emails for the test and rebuilds the cached pattern."""
+    with patch.object(phase1_supplier, "settings") as mock_settings:
+
+        def _set(entries):
+            mock_settings.excluded_emails = entries
+            phase1_supplier._excluded_emails_pattern.cache_clear()
+
+        yield _set
+    phase1_supplier._excluded_emails_pattern.cache_clear()
+
+
+def test_filters_exact_and_domain_entries_in_one_pass(excluded_emails):
+    excluded_emails(["orders@ourshop.co.il", "@ourdomain.com", " "])
+
+    text = "From: Orders@OurShop.co.il\nCC: anyone@ourdomain.com, supplier@acme.co.il"
+
+    assert filter_email_context(text) == "From: [FILTERED]\nCC: [FILTERED_DOMAIN], supplier@acme.co.il"
+
+
+def test_prefers_longer_exact_entry(excluded_emails):
+    excluded_emails(["a@shop.co", "a@shop.com"])
+
+    assert filter_email_context("write to a@shop.com") == "write to [FILTERED]"
+    assert filter_email_context("write to a@shop.co.il") == "write to [FILTERED].il"
+
+
+def test_no_excluded_entries_returns_text_unchanged(excluded_emails):
+    excluded_emails([])
+
+    assert filter_email_context("hello@acme.co.il") == "hello@acme.co.il"
+    assert filter_email_context(None) == ""
+
+
+def test_load_suppliers_csv_reparses_only_when_file_changes(tmp_path):
+    path = tmp_path / "suppliers.xlsx"
+    pd.DataFrame({"code": [100], "name": ["Acme"]}).to_excel(path, index=False)
+    load_workbook = excel_fallback.openpyxl.load_workbook
+
+    with (
+        patch.object(phase1_supplier, "SUPPLIERS_EXCEL_PATH", str(path)),
+        patch.object(excel_fallback.openpyxl, "load_workbook", wraps=load_workbook) as load,
+        patch.object(pd, "read_excel") as read_excel,
+    ):
+        assert load_suppliers_csv() == "code,name\n100,Acme\n"
+        assert load_suppliers_csv() == "code,name\n100,Acme\n"
+        assert load.call_count == 1
+
+        pd.DataFrame({"code": [200], "name": ["Beta"]}).to_excel(path, index=False)
+        mtime = os.path.getmtime(path) + 1
+        os.utime(path, (mtime, mtime))
+        assert load_suppliers_csv() == "code,name\n200,Beta\n"
+        assert load.call_count == 2
+
+        # Rewritten within the same mtime tick: the size change still invalidates
+        pd.DataFrame({"code": [300], "name": ["Gamma Foods"]}).to_excel(path, index=False)
+        os.utime(path, (mtime, mtime))
+        assert load_suppliers_csv() == "code,name\n300,Gamma Foods\n"
+        assert load.call_count == 3
+
+    read_excel.assert_not_called()
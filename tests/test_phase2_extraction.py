@@ -0,0 +1,12 @@
+from src.extraction.vertex.phase2_extraction import _strip_json_fence
+
+
+def test_strip_json_fence_takes_first_json_block():
+    text = 'Checked with code.\n```python\nprint(1)\n```\n```json\n{"orders": []}\n```\nDone.'
+    assert _strip_json_fence(text) == '{"orders": []}'
+
+
+def test_strip_json_fence_handles_unclosed_and_plain_fences():
+    assert _strip_json_fence('```json\n{"orders": []}') == '{"orders": []}'
+    assert _strip_json_fence('```\n{"orders": []}\n```') == '{"orders": []}'
+    assert _strip_json_fence(' {"orders": []} ') == '{"orders": []}'
@@ -4,15 +4,17 @@ from src.core.pipeline import ExtractionPipeline
 from src.shared.models import ExtractedOrder, LineItem
 
 
+@patch("src.core.pipeline.get_extraction_cache_service")
 @patch("src.core.pipeline.OrderProcessor")
 @patch("src.core.pipeline.LocalSupplierDetector")
-@patch("src.core.pipeline.ItemsService")
-@patch("src.core.pipeline.SupplierService")
+@patch("src.core.pipeline.get_items_service")
+@patch("src.core.pipeline.get_supplier_service")
 def test_pipeline_stages_new_items_without_persisting(
     mock_supplier_service,
     mock_items_service,
     mock_local_detector,
     mock_order_processor,
+    _mock_extraction_cache,
 ):
     mock_local_detector.return_value.detect_supplier.return_value = ("SUP1", 0.95, "sender_match")
     mock_supplier_service.return_value.get_supplier.return_value = {
@@ -50,3 +52,4 @@ def test_pipeline_stages_new_items_without_persisting(
     assert result.pending_new_items == [{"barcode": "7290000000001", "name": "Milk", "item_code": "7290000000001"}]
     assert result.new_items_data == [{"barcode": "7290000000001", "description": "Milk", "final_net_price": 5.5}]
     mock_items_service.return_value.add_new_items_batch.assert_not_called()
+    mock_local_detector.assert_called_once_with(mock_supplier_service.return_value)
@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from src.extraction.prompts import (
+    get_invoice_extraction_prompt,
+    get_invoice_extraction_prompt_parts,
+    get_supplier_detection_prompt,
+    get_supplier_detection_prompt_parts,
+)
+from src.extraction.schemas import calc_response_schema
+
+
+def test_trial_2_prompt_embeds_calc_schema():
+    prompt = get_invoice_extraction_prompt(trial=2)
+
+    assert json.dumps(calc_response_schema, separators=(",", ":")) in prompt
+
+
+def test_extraction_prompt_includes_supplier_and_email_instructions():
+    prompt = get_invoice_extraction_prompt(
+        email_context="Please apply 3% discount", supplier_instructions="Prices include VAT", trial=1
+    )
+
+    assert "SUPPLIER-SPECIFIC OVERRIDES" in prompt
+    assert "Prices include VAT" in prompt
+    assert prompt.count("Please apply 3% discount") == 1
+    assert prompt.count("EMAIL BODY INSTRUCTIONS") == 1
+
+
+def test_unknown_trial_raises():
+    with pytest.raises(ValueError):
+        get_invoice_extraction_prompt(trial=3)
+
+
+def test_extraction_prompt_parts_keep_static_prefix_identical():
+    static_a, dynamic_a = get_invoice_extraction_prompt_parts(trial=1)
+    static_b, dynamic_b = get_invoice_extraction_prompt_parts(
+        email_context="Deliver Sunday", supplier_instructions="Net prices", trial=1
+    )
+
+    assert static_a == static_b
+    assert dynamic_a == ""
+    assert "Deliver Sunday" in dynamic_b and "Net prices" in dynamic_b
+    assert dynamic_b.index("Net prices") < dynamic_b.rindex("Deliver Sunday")
+    assert get_invoice_extraction_prompt("Deliver Sunday", "Net prices", trial=1) == static_b + dynamic_b
+
+
+def test_extraction_prompt_static_part_is_shared_across_contexts():
+    first = get_invoice_extraction_prompt_parts(email_context="email A", trial=2)
+    second = get_invoice_extraction_prompt_parts(email_context="email B", supplier_instructions="net", trial=2)
+
+    assert first[0] is second[0]
+    assert "email A" in first[1] and "email B" in second[1]
+
+
+def test_supplier_detection_prompt_fills_all_slots():
+    prompt = get_supplier_detection_prompt("email text", "INVOICE TEXT", "קוד,שם\n100,Acme")
+
+    assert "EMAIL BODY:\nemail text\n\nINVOICE TEXT\n" in prompt
+    assert "100,Acme" in prompt
+    assert "{" not in prompt
+    assert prompt == get_supplier_detection_prompt("email text", "INVOICE TEXT", "קוד,שם\n100,Acme")
+
+
+@pytest.mark.parametrize("trial", [1, 2])
+def test_extraction_prompt_source_indentation_is_stripped(trial):
+    static, dynamic = get_invoice_extraction_prompt_parts(
+        email_context="Deliver Sunday", supplier_instructions="Net prices", trial=trial
+    )
+
+    assert static.startswith("\nYou are an expert data extraction assistant")
+    assert "\n    " not in dynamic
+
+
+@pytest.mark.parametrize("trial", [1, 2])
+def test_totals_exception_is_stated_once(trial):
+    prompt = get_invoice_extraction_prompt(trial=trial)
+
+    assert prompt.count("*** BIG EXCEPTION") == 1
+    assert "VAT CORRECTION" in prompt and "MISSING GLOBAL DISCOUNT" in prompt
+
+
+def test_supplier_detection_prompt_parts_put_supplier_database_first():
+    static_a, context_a = get_supplier_detection_prompt_parts("first email", "[Invoice PDF attached above]", "100,Acme")
+    static_b, context_b = get_supplier_detection_prompt_parts("second email", "INVOICE TEXT", "100,Acme")
+
+    assert static_a == static_b
+    assert "100,Acme" in static_a and "first email" not in static_a
+    assert context_a.startswith("\nEMAIL BODY:\nfirst email\n")
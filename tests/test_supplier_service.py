@@ -0,0 +1,205 @@
+import threading
+import time
+import unittest
+from dataclasses import replace
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from src.data.supplier_service import SUPPLIER_DOC_CACHE_TTL, UNKNOWN_SUPPLIER, SupplierService
+
+
+def _mock_doc(doc_id: str, data: dict) -> MagicMock:
+    doc = MagicMock()
+    doc.id = doc_id
+    doc.exists = True
+    doc.to_dict.return_value = dict(data)
+    return doc
+
+
+SUPPLIER_DOCS = {
+    "100": {
+        "name": "Acme, Ltd",
+        "global_id": "512345678",
+        "email": "orders@acme.co.il",
+        "additional_emails": ["sales@acme.co.il"],
+        "phone": "03-1234567",
+        "special_instructions": "Apply 5% discount",
+    },
+    "200": {
+        "name": "Beta Foods",
+        "global_id": "",
+        "email": "beta@gmail.com",
+        "phone": "",
+        "special_instructions": "",
+    },
+}
+
+
+class TestSupplierService(unittest.TestCase):
+    def setUp(self):
+        self.mock_db = MagicMock()
+        self.mock_collection = MagicMock()
+        self.mock_db.collection.return_value = self.mock_collection
+        self.mock_collection.stream.side_effect = lambda: [
+            _mock_doc(code, data) for code, data in SUPPLIER_DOCS.items()
+        ]
+        self.service = SupplierService(firestore_client=self.mock_db)
+
+    def test_match_supplier_by_each_identifier(self):
+        self.assertEqual(self.service.match_supplier(global_id=" 512345678 "), "100")
+        self.assertEqual(self.service.match_supplier(phone="031234567"), "100")
+        self.assertEqual(self.service.match_supplier(email="SALES@acme.co.il"), "100")
+        self.assertEqual(self.service.match_supplier(email="someone@acme.co.il"), "100")
+        self.assertEqual(self.service.match_supplier(name=" beta foods "), "200")
+
+    def test_match_supplier_ignores_excluded_domains(self):
+        self.assertEqual(self.service.match_supplier(email="beta@gmail.com"), "200")
+        self.assertEqual(self.service.match_supplier(email="other@gmail.com"), UNKNOWN_SUPPLIER)
+
+    def test_match_supplier_memoizes_normalized_probes(self):
+        self.service.match_supplier(email="Orders@Acme.co.il ")
+        self.service.match_supplier(email="orders@acme.co.il")
+
+        info = self.service._match_cached.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+        self.service.invalidate_cache()
+        self.assertEqual(self.service._match_cached.cache_info().currsize, 0)
+
+    def test_fuzzy_match_name_reuses_last_result(self):
+        from rapidfuzz import fuzz
+
+        with patch.object(fuzz, "ratio", wraps=fuzz.ratio) as ratio:
+            self.assertEqual(self.service.fuzzy_match_name("Beta Food")[0], "200")
+            scans = ratio.call_count
+            self.assertEqual(self.service.fuzzy_match_name("Beta Food")[0], "200")
+            self.assertEqual(ratio.call_count, scans)
+
+            self.service.invalidate_cache()
+            self.assertEqual(self.service.fuzzy_match_name("Beta Food")[0], "200")
+            self.assertEqual(ratio.call_count, 2 * scans)
+
+    def test_fuzzy_match_name_requires_a_single_close_name(self):
+        self.assertEqual(self.service.fuzzy_match_name("Acme Ltd")[0], "100")
+        self.assertIsNone(self.service.fuzzy_match_name("Gamma Drinks"))
+
+        self.mock_collection.stream.side_effect = lambda: [
+            _mock_doc("200", SUPPLIER_DOCS["200"]),
+            _mock_doc("201", {"name": "Beta Foods."}),  # two names now clear the threshold
+        ]
+        self.service.invalidate_cache()
+        self.assertIsNone(self.service.fuzzy_match_name("Beta Foods"))
+
+    def test_readers_keep_a_consistent_snapshot_across_invalidation(self):
+        self.service.match_supplier(global_id="512345678")
+        snapshot = self.service._snapshot
+
+        self.mock_collection.stream.side_effect = lambda: [_mock_doc("300", {"name": "Other", "global_id": "1"})]
+        self.service.invalidate_cache()
+
+        # A reader that took the old snapshot still resolves against it in full
+        self.assertEqual(self.service._match_supplier_uncached(snapshot, "512345678", None, None, None), "100")
+        self.assertEqual(self.service.match_supplier(global_id="512345678"), UNKNOWN_SUPPLIER)
+        self.assertEqual(self.service.match_supplier(global_id="1"), "300")
+
+    def test_get_all_suppliers_returns_full_records(self):
+        suppliers = self.service.get_all_suppliers()
+
+        self.assertEqual([s["code"] for s in suppliers], ["100", "200"])
+        self.assertEqual(suppliers[0]["additional_emails"], ["sales@acme.co.il"])
+        self.assertEqual(suppliers[0]["special_instructions"], "Apply 5% discount")
+
+    def test_get_suppliers_csv_escapes_commas(self):
+        self.mock_collection.document.return_value.get.return_value.exists = False
+
+        csv_text = self.service.get_suppliers_csv()
+
+        self.assertEqual(
+            csv_text,
+            "קוד,שם,עוסק_מורשה,טלפון,אימייל\n"
+            "100,Acme  Ltd,512345678,03-1234567,orders@acme.co.il\n"
+            "200,Beta Foods,,,beta@gmail.com\n",
+        )
+
+    def test_get_suppliers_csv_reloads_when_meta_timestamp_advances(self):
+        meta_doc = self.mock_collection.document.return_value.get.return_value
+        meta_doc.exists = True
+        meta_doc.to_dict.return_value = {"last_modified": datetime(2024, 1, 1, tzinfo=UTC)}
+
+        first = self.service.get_suppliers_csv()
+        self.assertIs(self.service.get_suppliers_csv(), first)
+        self.assertEqual(self.mock_collection.stream.call_count, 1)
+
+        meta_doc.to_dict.return_value = {"last_modified": datetime(2024, 1, 2, tzinfo=UTC)}
+        self.service.get_suppliers_csv()
+
+        self.assertEqual(self.mock_collection.stream.call_count, 2)
+
+    def test_get_supplier_reads_document_when_cache_is_cold(self):
+        self.mock_collection.document.return_value.get.return_value = _mock_doc("100", SUPPLIER_DOCS["100"])
+
+        self.assertEqual(self.service.get_supplier("100")["name"], "Acme, Ltd")
+        self.mock_collection.stream.assert_not_called()
+
+    def test_get_supplier_served_from_warm_cache(self):
+        self.mock_collection.stream.side_effect = lambda: [
+            _mock_doc("100", SUPPLIER_DOCS["100"]),
+            _mock_doc("300", {"name": "No Instructions"}),
+        ]
+        self.service.match_supplier(global_id="512345678")
+        self.mock_collection.document.reset_mock()
+
+        supplier = self.service.get_supplier("100")
+        self.assertEqual(supplier, SUPPLIER_DOCS["100"])
+        self.assertEqual(self.service.get_supplier_instructions("100"), "Apply 5% discount")
+        self.assertIsNone(self.service.get_supplier_instructions("300"))
+        self.mock_collection.document.assert_not_called()
+
+        supplier["additional_emails"].append("leak@acme.co.il")
+        self.assertEqual(self.service.get_supplier("100")["additional_emails"], ["sales@acme.co.il"])
+
+        self.mock_collection.document.return_value.get.return_value.exists = False
+        self.assertIsNone(self.service.get_supplier("999"))
+        self.mock_collection.document.assert_called_with("999")
+
+    def test_get_supplier_rereads_document_once_cache_is_older_than_ttl(self):
+        self.service.match_supplier(global_id="512345678")
+        self.service._snapshot = replace(
+            self.service._snapshot, loaded_at=datetime.now() - SUPPLIER_DOC_CACHE_TTL - timedelta(seconds=1)
+        )
+        edited = dict(SUPPLIER_DOCS["100"], special_instructions="Edited elsewhere")
+        self.mock_collection.document.return_value.get.return_value = _mock_doc("100", edited)
+
+        self.assertEqual(self.service.get_supplier_instructions("100"), "Edited elsewhere")
+        self.assertEqual(self.service.get_supplier("100")["special_instructions"], "Edited elsewhere")
+        self.mock_collection.document.assert_called_with("100")
+
+    def test_concurrent_first_lookups_stream_collection_once(self):
+        def slow_stream():
+            time.sleep(0.05)
+            return [_mock_doc(code, data) for code, data in SUPPLIER_DOCS.items()]
+
+        self.mock_collection.stream.side_effect = slow_stream
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.service.match_supplier(global_id="512345678")))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["100"] * 4)
+        self.assertEqual(self.mock_collection.stream.call_count, 1)
+
+    def test_invalidate_cache_reloads_from_firestore(self):
+        self.service.match_supplier(global_id="512345678")
+        self.service.invalidate_cache()
+        self.service.match_supplier(global_id="512345678")
+
+        self.assertEqual(self.mock_collection.stream.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
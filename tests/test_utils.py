@@ -0,0 +1,21 @@
+import os
+
+import pytest
+
+from src.shared.utils import read_file_bytes
+
+
+def test_read_file_bytes_reflects_file_changes(tmp_path):
+    path = tmp_path / "invoice.pdf"
+    path.write_bytes(b"%PDF-1.4 first")
+    assert read_file_bytes(str(path)) == b"%PDF-1.4 first"
+
+    path.write_bytes(b"%PDF-1.4 second, longer")
+    assert read_file_bytes(str(path)) == b"%PDF-1.4 second, longer"
+
+
+def test_read_file_bytes_missing_file_raises(tmp_path):
+    missing = os.path.join(tmp_path, "missing.pdf")
+
+    with pytest.raises(FileNotFoundError):
+        read_file_bytes(missing)
@@ -0,0 +1,30 @@
+from unittest.mock import MagicMock
+
+import pytest
+from google.genai import types
+
+from src.extraction.vertex import client as vertex_client
+
+
+@pytest.fixture
+def genai_client(monkeypatch):
+    client = MagicMock()
+    monkeypatch.setattr(vertex_client, "_client", client)
+    return client
+
+
+def test_dev_response_cache_replays_identical_requests(genai_client, monkeypatch, tmp_path):
+    monkeypatch.setattr(vertex_client.settings, "GEMINI_RESPONSE_CACHE_DIR", str(tmp_path / "responses"))
+    monkeypatch.setattr(vertex_client.settings, "ENVIRONMENT", "dev")
+    monkeypatch.delenv("K_SERVICE", raising=False)
+    genai_client.models.generate_content.return_value = types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(parts=[types.Part.from_text(text='{"orders": []}')]))]
+    )
+    config = types.GenerateContentConfig(temperature=0.0)
+
+    first = vertex_client.generate_content_safe("model", [types.Part.from_text(text="invoice")], config)
+    second = vertex_client.generate_content_safe("model", [types.Part.from_text(text="invoice")], config)
+    vertex_client.generate_content_safe("model", [types.Part.from_text(text="other")], config)
+
+    assert first.text == second.text == '{"orders": []}'
+    assert genai_client.models.generate_content.call_count == 2